@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""Benchmark the parse, compute and dispatch hot paths of the integration.
+
+Throughput ratios between cases that run on the same machine, such as the
+dispatcher against fanning out to every coordinator, do not depend on the
+hardware, so the run fails wherever one drops below its minimum; CI runs
+it this way. Throughput of each case can also be compared against a
+baseline recorded on one machine, which fails the run when a case
+regresses by more than the threshold:
+
+    python benchmark.py --save        # record benchmark_baseline.json
+    python benchmark.py               # check ratios and compare against it
+
+The cost of loading the integration, which adds to every Home Assistant
+start, is reported against a fixed budget as well. Being wall-clock time it
+only fails the run with --budgets, on a machine the budget was set for.
+"""
+
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+
+from homeassistant.components.bluetooth import BluetoothChange
+
+from custom_components.yunmai_scale.dispatcher import YunmaiDispatcher
+from custom_components.yunmai_scale.parse_data import process_data
+from custom_components.yunmai_scale.yunmai_kernel import compile_profile
+from custom_components.yunmai_scale.yunmai_lib import YmLib
+from harness import async_create_hass, create_coordinator, make_frame, make_service_info
+
+DEFAULT_BASELINE = Path(__file__).parent / "benchmark_baseline.json"
+DEFAULT_THRESHOLD = 0.2
+REPEAT = 5
+BATCH = 2000
+SCALE_COUNTS = (1, 10, 100)
+
+# Minimum throughput of a case relative to another one measured in the same
+# run, with a margin below the measured ratio
+RATIO_GATES = {
+    # Routing by frame prefix must beat every coordinator checking the MAC.
+    # With 10 scales the dispatcher measured 1.77x, too close to the cost of
+    # the service info shared by both paths to gate on; that fixed cost puts
+    # 100 scales at about 9.5x
+    ("dispatcher.100", "coordinator.fan_out.100"): 4.0,
+    # The compiled kernel must not be slower than calling YmLib; measured 1.22x
+    ("metrics.kernel", "metrics.ymlib"): 1.0,
+}
+
+# Startup budgets in milliseconds; wall-clock times depend on the machine,
+# so they only fail the run with --budgets
+IMPORT_BUDGET_MS = 50
+
+# Home Assistant itself, including the Bluetooth integration this one
+# depends on, is imported before the clock starts, as it is when the
+# integration is loaded by a running instance
+IMPORT_SCRIPT = """
+import homeassistant.config_entries, homeassistant.helpers.config_validation
+import homeassistant.components.bluetooth, homeassistant.helpers.selector
+start = time.perf_counter()
+import custom_components.yunmai_scale, custom_components.yunmai_scale.config_flow
+print((time.perf_counter() - start) * 1000)
+"""
+
+
+def scale_address(index):
+    """Return the MAC address of a virtual scale."""
+    return f"AA:BB:CC:00:{index >> 8:02X}:{index & 0xFF:02X}"
+
+
+def parse_cases():
+    """Benchmarks of process_data per frame type."""
+    address = scale_address(0)
+    idle = make_frame(address, 1, 0x00, 0)[1].hex()
+    measuring = [
+        make_frame(address, 1, 0x01, 50 + i * 0.01)[1].hex() for i in range(BATCH)
+    ]
+    stable = make_frame(address, 1, 0x03, 72.5, 520)[1].hex()
+
+    def run_idle():
+        for _ in range(BATCH):
+            process_data(idle)
+
+    def run_measuring():
+        for data in measuring:
+            process_data(data)
+
+    def run_stable():
+        for _ in range(BATCH):
+            process_data(stable)
+
+    return {
+        "process_data.idle": (run_idle, BATCH),
+        "process_data.measuring": (run_measuring, BATCH),
+        "process_data.stable": (run_stable, BATCH),
+    }
+
+
+def ymlib_cases():
+    """Benchmarks of each YmLib method."""
+    scale = YmLib(1, 175, False)
+    calls = {
+        "get_bmi": lambda: scale.get_bmi(72.5),
+        "get_fat": lambda: scale.get_fat(30, 72.5, 520),
+        "get_muscle": lambda: scale.get_muscle(18.2),
+        "get_water": lambda: scale.get_water(18.2),
+        "get_bone_mass": lambda: scale.get_bone_mass(54.8, 72.5),
+        "get_skeletal_muscle": lambda: scale.get_skeletal_muscle(18.2),
+        "get_lean_body_mass": lambda: scale.get_lean_body_mass(72.5, 18.2),
+        "get_visceral_fat": lambda: scale.get_visceral_fat(18.2, 30),
+    }
+
+    def batch(call):
+        def run():
+            for _ in range(BATCH):
+                call()
+
+        return run
+
+    return {f"YmLib.{name}": (batch(call), BATCH) for name, call in calls.items()}
+
+
+def kernel_cases():
+    """Benchmarks of computing all metrics of a reading with YmLib and the kernel."""
+    readings = [(50 + i * 0.01, 400 + i % 300, 20 + i % 50) for i in range(BATCH)]
+
+    def run_ymlib():
+        # compute_metrics as it was before the kernel
+        for weight, resistance, age in readings:
+            scale = YmLib(1, 175, False)
+            fat = scale.get_fat(age, weight, resistance)
+            muscle = scale.get_muscle(fat)
+            {
+                "bmi": round(scale.get_bmi(weight), 1),
+                "body_fat": round(fat, 1),
+                "muscle_mass": round(muscle, 1),
+                "water_percentage": round(scale.get_water(fat), 1),
+                "bone_mass": round(scale.get_bone_mass(muscle, weight), 1),
+                "skeletal_muscle": round(scale.get_skeletal_muscle(fat), 1),
+                "lean_body_mass": round(scale.get_lean_body_mass(weight, fat), 1),
+                "visceral_fat": round(scale.get_visceral_fat(fat, age)),
+            }
+
+    def run_kernel():
+        kernel = compile_profile(1, 175, False)
+        for weight, resistance, age in readings:
+            kernel(weight, resistance, age)
+
+    return {
+        "metrics.ymlib": (run_ymlib, BATCH),
+        "metrics.kernel": (run_kernel, BATCH),
+    }
+
+
+def coordinator_cases(hass):
+    """Benchmarks of Bluetooth event handling with several configured scales."""
+    cases = {}
+    for scales in SCALE_COUNTS:
+        coordinators = [
+            create_coordinator(hass, scale_address(i)) for i in range(scales)
+        ]
+        dispatcher = YunmaiDispatcher(hass, register_callback=False)
+        for coordinator in coordinators:
+            dispatcher.async_add_coordinator(coordinator)
+
+        # Measuring frames with changing weights, spread over all scales
+        service_infos = []
+        for i in range(BATCH):
+            address = scale_address(i % scales)
+            mfr_id, mfr_data = make_frame(address, 1, 0x01, 50 + (i % 997) * 0.01)
+            service_infos.append(make_service_info(address, {mfr_id: mfr_data}))
+
+        def run_fan_out(coordinators=coordinators, service_infos=service_infos):
+            # Every coordinator receives every advertisement
+            for service_info in service_infos:
+                for coordinator in coordinators:
+                    coordinator.async_handle_bluetooth_event(
+                        service_info, BluetoothChange.ADVERTISEMENT
+                    )
+
+        def run_dispatcher(dispatcher=dispatcher, service_infos=service_infos):
+            for service_info in service_infos:
+                dispatcher.async_handle_bluetooth_event(
+                    service_info, BluetoothChange.ADVERTISEMENT
+                )
+
+        cases[f"coordinator.fan_out.{scales}"] = (run_fan_out, BATCH)
+        cases[f"dispatcher.{scales}"] = (run_dispatcher, BATCH)
+    return cases
+
+
+def best_script_time(script, *args):
+    """Return the best time in ms printed by a script run in fresh interpreters."""
+    return min(
+        float(
+            subprocess.run(
+                [sys.executable, "-c", script, *args],
+                capture_output=True,
+                check=True,
+                cwd=Path(__file__).parent,
+                text=True,
+            ).stdout
+        )
+        for _ in range(REPEAT)
+    )
+
+
+def check_budgets():
+    """Print the startup costs and return those over budget."""
+    costs = {
+        "startup.import": (best_script_time(IMPORT_SCRIPT), IMPORT_BUDGET_MS),
+    }
+    over = []
+    print()
+    for name, (elapsed, budget) in costs.items():
+        exceeded = elapsed > budget
+        if exceeded:
+            over.append(name)
+        print(
+            f"{name:40} {elapsed:>11.1f} ms (budget {budget} ms) {'OVER BUDGET' if exceeded else ''}"
+        )
+    return over
+
+
+def measure(run, operations):
+    """Return the best throughput of a case in operations per second."""
+    run()  # warm up
+    best = min(timeit.Timer(run).repeat(repeat=REPEAT, number=1))
+    return operations / best
+
+
+async def run_benchmarks(name_filter):
+    """Run the cases matching the filter and return their throughput."""
+    over_budget = check_budgets()
+    hass = await async_create_hass(tempfile.mkdtemp())
+    print()
+    cases = {
+        **parse_cases(),
+        **ymlib_cases(),
+        **kernel_cases(),
+        **coordinator_cases(hass),
+    }
+
+    results = {}
+    for name, (run, operations) in cases.items():
+        if name_filter and name_filter not in name:
+            continue
+        results[name] = measure(run, operations)
+        print(f"{name:40} {results[name]:>14,.0f} ops/s")
+
+    await hass.async_block_till_done()
+    await hass.async_stop(force=True)
+    return results, over_budget
+
+
+def check_ratios(results):
+    """Print the throughput ratios of the gated cases and return those too low."""
+    failed = []
+    print()
+    for (case, reference), minimum in RATIO_GATES.items():
+        if case not in results or reference not in results:
+            continue
+        ratio = results[case] / results[reference]
+        name = f"{case} / {reference}"
+        if ratio < minimum:
+            failed.append(name)
+        print(
+            f"{name:60} {ratio:>7.2f}x (min {minimum:g}x) {'TOO SLOW' if ratio < minimum else ''}"
+        )
+    return failed
+
+
+def compare(results, baseline, threshold):
+    """Print the change against the baseline and return the regressed cases."""
+    regressions = []
+    print()
+    for name, ops in results.items():
+        if name not in baseline:
+            print(f"{name:40} {'new':>14}")
+            continue
+        change = ops / baseline[name] - 1
+        regressed = change < -threshold
+        if regressed:
+            regressions.append(name)
+        print(f"{name:40} {change:>+13.1%} {'REGRESSION' if regressed else ''}")
+    return regressions
+
+
+def main():
+    """Run the benchmarks and exit non-zero when a gate fails."""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--baseline", type=Path, default=DEFAULT_BASELINE, help="baseline file"
+    )
+    parser.add_argument(
+        "--save", action="store_true", help="store the results as the new baseline"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="allowed throughput drop (0.2 = 20%%)",
+    )
+    parser.add_argument(
+        "--filter", default="", help="only run cases containing this text"
+    )
+    parser.add_argument(
+        "--budgets",
+        action="store_true",
+        help="fail when a startup cost is over its budget",
+    )
+    args = parser.parse_args()
+
+    results, over_budget = asyncio.run(run_benchmarks(args.filter))
+    if over_budget and args.budgets:
+        print(f"\n{len(over_budget)} startup cost(s) over budget")
+        return 1
+
+    if failed_ratios := check_ratios(results):
+        print(f"\n{len(failed_ratios)} ratio(s) below their minimum")
+        return 1
+
+    if args.save:
+        baseline = (
+            json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+        )
+        baseline.update(results)
+        args.baseline.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        print(f"\nSaved baseline to {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"\nNo baseline at {args.baseline}; only ratios were checked")
+        return 0
+
+    regressions = compare(
+        results, json.loads(args.baseline.read_text()), args.threshold
+    )
+    if regressions:
+        print(
+            f"\n{len(regressions)} case(s) regressed by more than {args.threshold:.0%}"
+        )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""Compact capture files of raw Yunmai scale advertisements."""
+
+from __future__ import annotations
+
+import struct
+from collections.abc import Iterator
+from pathlib import Path
+from typing import BinaryIO, NamedTuple, Self
+
+MAGIC = b"YMCAP\x01"
+# timestamp(8) address(6) rssi(1) manufacturer id(2) data length(1), then data
+RECORD_HEADER = struct.Struct("<d6sbHB")
+
+
+class CapturedFrame(NamedTuple):
+    """Single captured advertisement."""
+
+    timestamp: float  # seconds since the epoch
+    address: str
+    rssi: int
+    mfr_id: int
+    mfr_data: bytes
+
+
+class CaptureWriter:
+    """Append advertisements to a capture file."""
+
+    def __init__(self, path: Path) -> None:
+        """Open a new capture file."""
+        self._file: BinaryIO = path.open("wb")
+        self._file.write(MAGIC)
+        self.frames = 0
+
+    def write(
+        self, timestamp: float, address: str, rssi: int, mfr_id: int, mfr_data: bytes
+    ) -> None:
+        """Write a single advertisement."""
+        try:
+            raw_address = bytes.fromhex(address.replace(":", ""))
+        except ValueError:
+            raw_address = b""
+        if len(raw_address) != 6:
+            # Platforms without MAC addresses (macOS) report device UUIDs
+            raw_address = bytes(6)
+
+        self._file.write(
+            RECORD_HEADER.pack(
+                timestamp,
+                raw_address,
+                max(-128, min(127, rssi)),
+                mfr_id,
+                len(mfr_data),
+            )
+        )
+        self._file.write(mfr_data)
+        self.frames += 1
+
+    def close(self) -> None:
+        """Close the capture file."""
+        self._file.close()
+
+    def __enter__(self) -> Self:
+        """Enter the context manager."""
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Close the file when leaving the context manager."""
+        self.close()
+
+
+def read_capture(path: Path) -> Iterator[CapturedFrame]:
+    """Read all advertisements of a capture file."""
+    with path.open("rb") as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a Yunmai capture file")
+
+        while header := file.read(RECORD_HEADER.size):
+            if len(header) < RECORD_HEADER.size:
+                raise ValueError(f"{path} is truncated")
+            timestamp, raw_address, rssi, mfr_id, length = RECORD_HEADER.unpack(header)
+            mfr_data = file.read(length)
+            if len(mfr_data) < length:
+                raise ValueError(f"{path} is truncated")
+            yield CapturedFrame(
+                timestamp, raw_address.hex(":").upper(), rssi, mfr_id, mfr_data
+            )
@@ -1,134 +1,138 @@
 """The Yunmai Scale integration."""
 
-import logging
-from typing import Any
-
-from homeassistant.components.bluetooth import (
-    BluetoothCallbackMatcher,
-    BluetoothChange,
-    BluetoothScanningMode,
-    BluetoothServiceInfoBleak,
-    async_register_callback,
-)
-from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_ADDRESS, CONF_NAME, Platform
-from homeassistant.core import HomeAssistant, callback
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from __future__ import annotations
+
+import importlib
+from types import ModuleType
+from typing import TYPE_CHECKING
+
+from homeassistant.config_entries import SOURCE_IMPORT, ConfigEntry
+from homeassistant.const import CONF_ADDRESS, Platform
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.typing import ConfigType
 
 from .const import (
-    CONF_AGE,
-    CONF_GENDER,
-    CONF_HEIGHT,
-    CONF_IS_ACTIVE,
+    CONF_ACTIVE_SYNC,
+    CONF_MEASURING_INTERVAL,
+    CONF_SCALES,
+    DATA_DISPATCHER,
+    DEFAULT_MEASURING_INTERVAL,
     DOMAIN,
-    SERVICE_UUID,
+    SERVICE_IMPORT_STATISTICS,
+    TREND_SEED_RECORDS,
 )
-from .parse_data import process_data
 
-_LOGGER = logging.getLogger(__name__)
+if TYPE_CHECKING:
+    from .coordinator import YunmaiDataCoordinator
 
 PLATFORMS = [Platform.SENSOR]
 
 
-async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
-    """Set up Yunmai Scale from a config entry."""
-    hass.data.setdefault(DOMAIN, {})
+def _validate_config(config: ConfigType) -> ConfigType:
+    """Validate the scales configured in YAML, if there are any."""
+    if DOMAIN not in config:
+        return config
+    # Only loaded when scales are configured in YAML, which few setups do
+    from .provisioning import CONFIG_SCHEMA
 
-    coordinator = YunmaiDataCoordinator(hass, entry)
+    return CONFIG_SCHEMA(config)
 
-    hass.data[DOMAIN][entry.entry_id] = coordinator
 
-    entry.async_on_unload(
-        async_register_callback(
-            hass,
-            coordinator.async_handle_bluetooth_event,
-            BluetoothCallbackMatcher(service_uuid=SERVICE_UUID),
-            BluetoothScanningMode.PASSIVE,
-        )
+CONFIG_SCHEMA = _validate_config
+
+
+async def _async_import(hass: HomeAssistant, name: str) -> ModuleType:
+    """Import a module of the integration that is only needed once a scale is set up."""
+    return await hass.async_add_import_executor_job(
+        importlib.import_module, f"{__name__}.{name}"
     )
 
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Import scales configured in YAML."""
+    if DOMAIN not in config:
+        return True
+
+    from .config_flow import format_unique_id
+    from .provisioning import scale_entry_data
+
+    # Scales that are already set up are skipped without starting a flow
+    for scale in config[DOMAIN][CONF_SCALES]:
+        data = scale_entry_data(scale)
+        if hass.config_entries.async_entry_for_domain_unique_id(
+            DOMAIN, format_unique_id(data[CONF_ADDRESS])
+        ):
+            continue
+        hass.async_create_task(
+            hass.config_entries.flow.async_init(
+                DOMAIN, context={"source": SOURCE_IMPORT}, data=data
+            )
+        )
     return True
 
 
-async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
-    """Unload a config entry."""
-    if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        hass.data[DOMAIN].pop(entry.entry_id)
-
-    return unload_ok
+async def async_create_coordinator(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> YunmaiDataCoordinator:
+    """Create the coordinator of a scale with its stored state loaded."""
+    # Deferred so that loading the integration, e.g. for discovery, stays cheap
+    coordinator_module = await _async_import(hass, "coordinator")
+    coordinator = coordinator_module.YunmaiDataCoordinator(hass, entry)
+    await coordinator.async_load_profile_weights()
+    await hass.async_add_executor_job(coordinator.history.migrate)
+    coordinator.async_seed_trends(
+        await hass.async_add_executor_job(coordinator.history.tail, TREND_SEED_RECORDS)
+    )
+    return coordinator
 
 
-class YunmaiDataCoordinator(DataUpdateCoordinator):
-    """Class to manage fetching Yunmai Scale data."""
-
-    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
-        """Initialize the data coordinator."""
-        self.entry = entry
-        self.mac_address = entry.data.get(CONF_ADDRESS)
-        self.user_info = {
-            CONF_GENDER: entry.data.get(CONF_GENDER, 1),  # 1 for male, 0 for female
-            CONF_HEIGHT: entry.data.get(CONF_HEIGHT, 170),
-            CONF_IS_ACTIVE: entry.data.get(CONF_IS_ACTIVE, False),
-            CONF_AGE: entry.data.get(CONF_AGE, 30),
-        }
-        self._device_info = {
-            "name": entry.data.get(CONF_NAME, "Yunmai Scale"),
-            "model": "Yunmai Scale",
-            "manufacturer": "Yunmai",
-            "identifiers": {(DOMAIN, self.mac_address)},
-        }
-
-        super().__init__(
-            hass,
-            _LOGGER,
-            name=f"{DOMAIN}_{self.mac_address}",
+async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Set up Yunmai Scale from a config entry."""
+    coordinator = await async_create_coordinator(hass, entry)
+    domain_data = hass.data.setdefault(DOMAIN, {})
+
+    # A single Bluetooth callback is shared by all configured scales
+    if (dispatcher := domain_data.get(DATA_DISPATCHER)) is None:
+        dispatcher_module = await _async_import(hass, "dispatcher")
+        dispatcher = domain_data[DATA_DISPATCHER] = dispatcher_module.YunmaiDispatcher(
+            hass
         )
 
-    @property
-    def device_info(self) -> dict[str, Any]:
-        """Return device info."""
-        return self._device_info
-
-    async def _async_update_data(self) -> dict:
-        """No-op: data is pushed via Bluetooth callbacks."""
-        return self.data or {}
-
-    @callback
-    def async_handle_bluetooth_event(
-        self,
-        service_info: BluetoothServiceInfoBleak,
-        change: BluetoothChange,
-    ) -> None:
-        """Handle a Bluetooth event from Home Assistant."""
-        _LOGGER.debug(
-            "Received Bluetooth event from %s (change=%s)",
-            service_info.address,
-            change,
-        )
+    # Services are registered with the first scale rather than in async_setup,
+    # so that loading the integration does not import them
+    if not hass.services.has_service(DOMAIN, SERVICE_IMPORT_STATISTICS):
+        services_module = await _async_import(hass, "services")
+        services_module.async_setup_services(hass)
 
-        for mfr_id, mfr_data in service_info.advertisement.manufacturer_data.items():
-            # Compute MAC from manufacturer data
-            manufacturer_data_hex = (
-                mfr_id.to_bytes(2, "little").hex() + mfr_data.hex()
-            )
-            device_mac = ':'.join(
-                manufacturer_data_hex[:12].upper()[i : i + 2]
-                for i in range(10, -2, -2)
-            )
+    domain_data[entry.entry_id] = coordinator
 
-            if device_mac.upper() != self.mac_address.upper():
-                continue
+    entry.async_on_unload(dispatcher.async_add_coordinator(coordinator))
+    entry.async_on_unload(coordinator.async_stop)
+    entry.async_on_unload(entry.add_update_listener(async_update_options))
 
-            data_hex = mfr_data.hex()
-            processed_data = process_data(
-                data_hex,
-                self.user_info[CONF_AGE],
-                self.user_info[CONF_GENDER],
-                self.user_info[CONF_HEIGHT],
-                self.user_info[CONF_IS_ACTIVE],
-            )
-            if processed_data:
-                self.async_set_updated_data(processed_data)
-                return
+    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+
+    return True
+
+
+async def async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Apply updated options to the running coordinator."""
+    coordinator: YunmaiDataCoordinator = hass.data[DOMAIN][entry.entry_id]
+    coordinator.measuring_interval = entry.options.get(
+        CONF_MEASURING_INTERVAL, DEFAULT_MEASURING_INTERVAL
+    )
+    coordinator.active_sync = entry.options.get(CONF_ACTIVE_SYNC, False)
+    # Also applies changed user info and drops weights of removed profiles
+    coordinator.load_profiles()
+    await coordinator.async_save_profile_weights()
+
+
+async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Unload a config entry."""
+    if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
+        coordinator: YunmaiDataCoordinator = hass.data[DOMAIN].pop(entry.entry_id)
+        await hass.async_add_executor_job(coordinator.history.flush)
+        # Saved before a reload loads them again
+        await coordinator.async_save_profile_weights()
+
+    return unload_ok
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import re
 from typing import Any
@@ -11,20 +12,31 @@ from bluetooth_data_tools import short_address
 from homeassistant import config_entries
 from homeassistant.components.bluetooth import BluetoothServiceInfoBleak
 from homeassistant.const import CONF_ADDRESS, CONF_NAME
-from homeassistant.data_entry_flow import FlowResult
+from homeassistant.core import callback
+from homeassistant.data_entry_flow import FlowResult, FlowResultType
+from homeassistant.helpers.selector import TextSelector, TextSelectorConfig
 
 from .const import (
+    CONF_ACTIVE_SYNC,
     CONF_AGE,
     CONF_GENDER,
     CONF_HEIGHT,
     CONF_IS_ACTIVE,
+    CONF_MEASURING_INTERVAL,
+    CONF_PROFILES,
+    CONF_SCALES,
+    CONF_WEIGHT,
+    DEFAULT_MEASURING_INTERVAL,
+    DEFAULT_PROFILE_NAME,
     DOMAIN,
+    MAC_PATTERN,
     SERVICE_UUID,
 )
+from .provisioning import parse_scales_csv, scale_entry_data
 
 _LOGGER = logging.getLogger(__name__)
 
-MAC_REGEX = re.compile(r"^([0-9A-F]{2}:){5}([0-9A-F]{2})$")
+MAC_REGEX = re.compile(MAC_PATTERN)
 
 
 def format_unique_id(address: str) -> str:
@@ -42,6 +54,14 @@ class YunmaiConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         self.discovered_devices = {}
         self.selected_device = None
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> YunmaiOptionsFlow:
+        """Get the options flow for this handler."""
+        return YunmaiOptionsFlow()
+
     async def async_step_bluetooth(
         self, discovery_info: BluetoothServiceInfoBleak
     ) -> FlowResult:
@@ -72,10 +92,87 @@ class YunmaiConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
         return await self.async_step_user()
 
+    async def async_step_import(self, import_data: dict[str, Any]) -> FlowResult:
+        """Create an entry for a scale provisioned from YAML or CSV."""
+        await self.async_set_unique_id(format_unique_id(import_data[CONF_ADDRESS]))
+        self._abort_if_unique_id_configured()
+        return self.async_create_entry(
+            title=f"Yunmai Scale {short_address(import_data[CONF_ADDRESS])}",
+            data=import_data,
+        )
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
-        """Handle the user step to pick discovered device or manual entry."""
+        """Offer adding a single scale or many at once."""
+        if user_input is None and not self.discovered_devices:
+            return self.async_show_menu(step_id="user", menu_options=["manual", "bulk"])
+        return await self.async_step_manual(user_input)
+
+    async def async_step_bulk(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Add many scales at once from CSV."""
+        errors = {}
+        placeholders = {}
+
+        if user_input is not None:
+            try:
+                scales = parse_scales_csv(user_input[CONF_SCALES])
+            except vol.Invalid as err:
+                errors[CONF_SCALES] = "invalid_scales"
+                placeholders["error"] = str(err)
+            else:
+                # Known scales are skipped here rather than by a flow each
+                configured = self._async_current_ids()
+                new = [
+                    scale_entry_data(scale)
+                    for scale in scales
+                    if format_unique_id(scale[CONF_ADDRESS]) not in configured
+                ]
+                results = await asyncio.gather(
+                    *(
+                        self.hass.config_entries.flow.async_init(
+                            DOMAIN,
+                            context={"source": config_entries.SOURCE_IMPORT},
+                            data=data,
+                        )
+                        for data in new
+                    )
+                )
+                failed = [
+                    data[CONF_ADDRESS]
+                    for data, result in zip(new, results, strict=True)
+                    if result["type"] is not FlowResultType.CREATE_ENTRY
+                ]
+                return self.async_abort(
+                    reason="bulk_import_failed" if failed else "bulk_import_finished",
+                    description_placeholders={
+                        "added": str(len(new) - len(failed)),
+                        "skipped": str(len(scales) - len(new)),
+                        "failed": ", ".join(failed),
+                    },
+                )
+
+        schema = vol.Schema(
+            {
+                vol.Required(CONF_SCALES): TextSelector(
+                    TextSelectorConfig(multiline=True)
+                )
+            }
+        )
+
+        return self.async_show_form(
+            step_id="bulk",
+            data_schema=schema,
+            errors=errors,
+            description_placeholders=placeholders,
+        )
+
+    async def async_step_manual(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Handle the step to pick a discovered device or enter one manually."""
         errors = {}
 
         if user_input is not None:
@@ -134,7 +231,7 @@ class YunmaiConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             )
 
         return self.async_show_form(
-            step_id="user",
+            step_id="manual",
             data_schema=schema,
             errors=errors,
         )
@@ -190,3 +287,117 @@ class YunmaiConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 "mac": self.selected_device[CONF_ADDRESS],
             },
         )
+
+
+class YunmaiOptionsFlow(config_entries.OptionsFlow):
+    """Handle Yunmai Scale options."""
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the options."""
+        return self.async_show_menu(
+            step_id="init",
+            menu_options=["settings", "add_profile", "remove_profile"],
+        )
+
+    async def async_step_settings(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the update settings."""
+        if user_input is not None:
+            return self.async_create_entry(
+                title="", data={**self.config_entry.options, **user_input}
+            )
+
+        schema = vol.Schema(
+            {
+                vol.Required(
+                    CONF_MEASURING_INTERVAL,
+                    default=self.config_entry.options.get(
+                        CONF_MEASURING_INTERVAL, DEFAULT_MEASURING_INTERVAL
+                    ),
+                ): vol.All(vol.Coerce(float), vol.Range(min=0, max=60)),
+                vol.Required(
+                    CONF_ACTIVE_SYNC,
+                    default=self.config_entry.options.get(CONF_ACTIVE_SYNC, False),
+                ): bool,
+            }
+        )
+
+        return self.async_show_form(step_id="settings", data_schema=schema)
+
+    async def async_step_add_profile(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Add a user profile sharing the scale."""
+        errors = {}
+        profiles = self.config_entry.options.get(CONF_PROFILES, [])
+
+        if user_input is not None:
+            name = user_input[CONF_NAME].strip()
+            if name == DEFAULT_PROFILE_NAME or any(
+                profile[CONF_NAME] == name for profile in profiles
+            ):
+                errors[CONF_NAME] = "profile_exists"
+            else:
+                profile = {**user_input, CONF_NAME: name}
+                return self.async_create_entry(
+                    title="",
+                    data={
+                        **self.config_entry.options,
+                        CONF_PROFILES: [*profiles, profile],
+                    },
+                )
+
+        schema = vol.Schema(
+            {
+                vol.Required(CONF_NAME): str,
+                vol.Required(CONF_GENDER, default=1): vol.In({1: "Male", 0: "Female"}),
+                vol.Required(CONF_HEIGHT, default=170): vol.All(
+                    vol.Coerce(int), vol.Range(min=100, max=220)
+                ),
+                vol.Required(CONF_AGE, default=30): vol.All(
+                    vol.Coerce(int), vol.Range(min=10, max=99)
+                ),
+                vol.Required(CONF_IS_ACTIVE, default=False): bool,
+                vol.Optional(CONF_WEIGHT): vol.All(
+                    vol.Coerce(float), vol.Range(min=5, max=250)
+                ),
+            }
+        )
+
+        return self.async_show_form(
+            step_id="add_profile", data_schema=schema, errors=errors
+        )
+
+    async def async_step_remove_profile(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Remove a user profile."""
+        profiles = self.config_entry.options.get(CONF_PROFILES, [])
+        if not profiles:
+            return self.async_abort(reason="no_profiles")
+
+        if user_input is not None:
+            # The coordinator drops the stored weight of a removed profile
+            name = user_input[CONF_NAME]
+            return self.async_create_entry(
+                title="",
+                data={
+                    **self.config_entry.options,
+                    CONF_PROFILES: [
+                        profile for profile in profiles if profile[CONF_NAME] != name
+                    ],
+                },
+            )
+
+        schema = vol.Schema(
+            {
+                vol.Required(CONF_NAME): vol.In(
+                    [profile[CONF_NAME] for profile in profiles]
+                ),
+            }
+        )
+
+        return self.async_show_form(step_id="remove_profile", data_schema=schema)
@@ -2,11 +2,64 @@
 
 DOMAIN = "yunmai_scale"
 
+# hass.data[DOMAIN] key of the shared Bluetooth dispatcher
+DATA_DISPATCHER = "dispatcher"
+
 # Configuration constants
 CONF_GENDER = "gender"
 CONF_HEIGHT = "height"
 CONF_IS_ACTIVE = "is_active"
 CONF_AGE = "age"
+CONF_WEIGHT = "weight"
+
+# Scales provisioned in bulk from YAML or CSV
+CONF_SCALES = "scales"
+
+MAC_PATTERN = r"^([0-9A-F]{2}:){5}([0-9A-F]{2})$"
+
+# Options constants
+CONF_MEASURING_INTERVAL = "measuring_interval"
+DEFAULT_MEASURING_INTERVAL = 1.0  # seconds between measuring-phase updates
+CONF_PROFILES = "profiles"
+CONF_ACTIVE_SYNC = "active_sync"
+CONF_PROFILE_WEIGHTS = "profile_weights"
+
+# Profile configured with the entry, used when no other profile matches
+DEFAULT_PROFILE_NAME = "Default"
+# kg a reading may differ from a profile's recent weight to be attributed to it
+PROFILE_WEIGHT_TOLERANCE = 3.0
+# Recent profile weights are kept in their own store rather than the entry
+# options, so saving them does not reload the profiles; saves are batched
+PROFILE_WEIGHTS_STORAGE_VERSION = 1
+PROFILE_WEIGHTS_SAVE_DELAY = 10
+
+# Seconds without a stable frame after which a weigh-in is finished
+WEIGH_IN_TIMEOUT = 3.0
+
+# Seconds between downloads of the readings stored on the scale, which are
+# started after a weigh-in when active sync is enabled
+SYNC_INTERVAL = 86400
+# Seconds a downloaded reading may be apart from a recorded one with the
+# same weight and resistance to be considered the same weigh-in
+SYNC_MATCH_WINDOW = 600
+
+# Stored weigh-ins the trends are rebuilt from at startup
+TREND_SEED_RECORDS = 256
+
+# Latest raw frames of each scale kept for diagnostics
+FRAME_LOG_SIZE = 128
+
+# Services
+SERVICE_IMPORT_STATISTICS = "import_statistics"
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_PROFILE = "profile"
+ATTR_READINGS = "readings"
+ATTR_TIMESTAMP = "timestamp"
+ATTR_WEIGHT = "weight"
+ATTR_RESISTANCE = "resistance"
+
+# Event fired once per finished weigh-in
+EVENT_WEIGH_IN = f"{DOMAIN}_weigh_in"
 
 # Yunmai BLE constants
 SERVICE_UUID = "00001320-0000-1000-8000-00805f9b34fb"
@@ -22,6 +75,19 @@ SENSOR_SKELETAL_MUSCLE = "skeletal_muscle"
 SENSOR_LEAN_BODY_MASS = "lean_body_mass"
 SENSOR_VISCERAL_FAT = "visceral_fat"
 SENSOR_STATUS = "scale_status"
+SENSOR_PROFILE = "profile"
+
+# Trend sensor key suffixes, appended to the sensor type of the metric
+TREND_EMA = "ema"
+TREND_ROLLING_MEAN = "rolling_mean"
+TREND_WEEKLY_DELTA = "weekly_delta"
+
+# Diagnostic sensor types
+SENSOR_FRAMES_RECEIVED = "frames_received"
+SENSOR_FRAMES_REJECTED = "frames_rejected"
+SENSOR_FRAMES_SUPPRESSED = "frames_suppressed"
+SENSOR_CALLBACK_LATENCY = "callback_latency"
+SENSOR_LAST_FRAME = "last_frame"
 
 # Units
 SCORE = "score"
@@ -37,3 +103,8 @@ ICON_SKELETAL = "mdi:human-handsup"
 ICON_LEAN = "mdi:human-male"
 ICON_VISCERAL = "mdi:stomach"
 ICON_STATUS = "mdi:information-outline"
+ICON_PROFILE = "mdi:account"
+ICON_COUNTER = "mdi:counter"
+ICON_LATENCY = "mdi:timer-outline"
+ICON_TREND = "mdi:chart-line"
+ICON_DELTA = "mdi:delta"
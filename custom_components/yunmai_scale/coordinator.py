@@ -0,0 +1,566 @@
+"""Data coordinator for the Yunmai Scale integration."""
+
+import logging
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from collections.abc import Callable, Iterable
+from pathlib import Path
+from typing import Any
+
+from homeassistant.components.bluetooth import (
+    BluetoothChange,
+    BluetoothServiceInfoBleak,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_ADDRESS, CONF_NAME
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.storage import STORAGE_DIR, Store
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+
+from .const import (
+    CONF_ACTIVE_SYNC,
+    CONF_AGE,
+    CONF_GENDER,
+    CONF_HEIGHT,
+    CONF_IS_ACTIVE,
+    CONF_MEASURING_INTERVAL,
+    CONF_PROFILE_WEIGHTS,
+    CONF_PROFILES,
+    DEFAULT_MEASURING_INTERVAL,
+    DEFAULT_PROFILE_NAME,
+    DOMAIN,
+    EVENT_WEIGH_IN,
+    PROFILE_WEIGHT_TOLERANCE,
+    PROFILE_WEIGHTS_SAVE_DELAY,
+    PROFILE_WEIGHTS_STORAGE_VERSION,
+    SYNC_INTERVAL,
+    SYNC_MATCH_WINDOW,
+    WEIGH_IN_TIMEOUT,
+)
+from .frame_log import FrameLog
+from .gatt_sync import (
+    BleakGattClient,
+    GattClient,
+    HistorySync,
+    StoredReading,
+    SyncError,
+)
+from .history import HISTORY_SUFFIX, HistoryRecord, MeasurementHistory, profile_id
+from .parse_data import (
+    CREDIBILITY_IDLE,
+    CREDIBILITY_OFFSET,
+    CREDIBILITY_STABLE,
+    IDLE_MEASUREMENT,
+    MEASUREMENT_FIELDS,
+    ScaleStatus,
+    YunmaiMeasurement,
+    decode_frame,
+    mac_to_frame_prefix,
+)
+from .profiles import ProfileIndex, UserProfile
+from .session import WeighInReading, WeighInTracker
+from .stats import CoordinatorStats
+from .trends import TrendTracker
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class YunmaiDataCoordinator(DataUpdateCoordinator):
+    """Class to manage fetching Yunmai Scale data."""
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+        """Initialize the data coordinator."""
+        self.entry = entry
+        self.mac_address = entry.data.get(CONF_ADDRESS)
+        # Expected (manufacturer id, data prefix) of frames sent by this scale
+        self.frame_prefix = mac_to_frame_prefix(self.mac_address or "")
+        self.user_info: dict[str, Any]
+        self.stats = CoordinatorStats()
+        # Latest raw frames matched to this scale, kept for diagnostics
+        self.frame_log = FrameLog()
+        # Readings are attributed to the profile whose recent weight is
+        # closest; see _match_profile for readings close to none of them
+        self.primary_profile: UserProfile
+        self.profiles: dict[str, UserProfile] = {}
+        self.profile_index = ProfileIndex(PROFILE_WEIGHT_TOLERANCE)
+        # Entries set up before the weights store existed kept them in options
+        self.weights_store: Store[dict[str, float]] = Store(
+            hass, PROFILE_WEIGHTS_STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}"
+        )
+        self._profile_weights: dict[str, float] = dict(
+            entry.options.get(CONF_PROFILE_WEIGHTS, {})
+        )
+        self.load_profiles()
+        # Finished weigh-ins are appended to a binary log in .storage
+        self.history = MeasurementHistory(
+            Path(
+                hass.config.path(
+                    STORAGE_DIR,
+                    DOMAIN,
+                    (self.mac_address or entry.entry_id).replace(":", "").lower()
+                    + HISTORY_SUFFIX,
+                )
+            )
+        )
+        # Trends of each metric per profile, updated with every weigh-in
+        self.trends = TrendTracker()
+        # Identical rebroadcasts are suppressed before parsing; a repeat is
+        # only processed again once duplicate_window seconds have passed
+        # (None suppresses repeats until the payload changes). Stable frames
+        # are never suppressed, since every copy counts towards the weigh-in
+        # median
+        self.duplicate_window: float | None = None
+        self._last_frame: bytes | None = None
+        self._last_frame_time = 0.0
+        # Measuring-phase updates are coalesced to at most one per
+        # measuring_interval seconds; stable and idle readings are not delayed
+        self.measuring_interval: float = entry.options.get(
+            CONF_MEASURING_INTERVAL, DEFAULT_MEASURING_INTERVAL
+        )
+        self._last_push_time = float("-inf")
+        self._pending_measurement: YunmaiMeasurement | None = None
+        self._cancel_pending_update: CALLBACK_TYPE | None = None
+        # Stable frames are aggregated into one measurement per weigh-in
+        self.weigh_in = WeighInTracker()
+        self._cancel_weigh_in_timeout: CALLBACK_TYPE | None = None
+        # Readings stored on the scale while nobody listened are downloaded
+        # over a connection at most once per SYNC_INTERVAL, after a weigh-in
+        # when the scale is awake
+        self.active_sync: bool = entry.options.get(CONF_ACTIVE_SYNC, False)
+        self.gatt_client_factory: Callable[[], GattClient] = lambda: BleakGattClient(
+            hass, self.mac_address
+        )
+        self._last_sync_time = float("-inf")
+        self._syncing = False
+        # Measurement fields whose value changed with the latest update, and
+        # the last non-empty value of each field they are compared against
+        self.changed_keys: frozenset[str] = frozenset()
+        self._last_values: dict[str, Any] = {}
+        self._device_info = {
+            "name": entry.data.get(CONF_NAME, "Yunmai Scale"),
+            "model": "Yunmai Scale",
+            "manufacturer": "Yunmai",
+            "identifiers": {(DOMAIN, self.mac_address)},
+        }
+
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=f"{DOMAIN}_{self.mac_address}",
+        )
+
+    def load_profiles(self) -> None:
+        """Load the user profiles of this scale from the config entry."""
+        data = self.entry.data
+        options = self.entry.options
+        weights = self._profile_weights
+
+        self.user_info = {
+            CONF_GENDER: data.get(CONF_GENDER, 1),  # 1 for male, 0 for female
+            CONF_HEIGHT: data.get(CONF_HEIGHT, 170),
+            CONF_IS_ACTIVE: data.get(CONF_IS_ACTIVE, False),
+            CONF_AGE: data.get(CONF_AGE, 30),
+        }
+
+        self.primary_profile = UserProfile(
+            DEFAULT_PROFILE_NAME,
+            self.user_info[CONF_GENDER],
+            self.user_info[CONF_HEIGHT],
+            self.user_info[CONF_AGE],
+            self.user_info[CONF_IS_ACTIVE],
+        )
+        profiles = [self.primary_profile]
+        profiles.extend(
+            UserProfile.from_dict(data) for data in options.get(CONF_PROFILES, [])
+        )
+
+        self.profiles = {}
+        self.profile_index = ProfileIndex(PROFILE_WEIGHT_TOLERANCE)
+        for profile in profiles:
+            profile.weight = weights.get(profile.name, profile.weight)
+            self.profiles[profile.name] = profile
+            self.profile_index.add(profile)
+        for name in weights.keys() - self.profiles.keys():
+            del weights[name]
+
+    async def async_load_profile_weights(self) -> None:
+        """Apply the recent profile weights saved by earlier weigh-ins."""
+        if weights := await self.weights_store.async_load():
+            self._profile_weights = weights
+            self.load_profiles()
+
+    async def async_save_profile_weights(self) -> None:
+        """Write the profile weights now instead of after the save delay."""
+        await self.weights_store.async_save(self._profile_weights)
+
+    @callback
+    def async_seed_trends(self, records: Iterable[HistoryRecord]) -> None:
+        """Rebuild the trends from stored weigh-ins of the current profiles."""
+        profiles = {
+            profile_id(profile.name): profile for profile in self.profiles.values()
+        }
+        for record in records:
+            if (profile := profiles.get(record.profile_id)) is None:
+                continue
+            self.trends.update(
+                profile.stable_measurement(
+                    record.weight, record.resistance, record.count, record.body_fat
+                ),
+                record.timestamp,
+            )
+
+    @property
+    def device_info(self) -> dict[str, Any]:
+        """Return device info."""
+        return self._device_info
+
+    async def _async_update_data(self) -> YunmaiMeasurement | None:
+        """No-op: data is pushed via Bluetooth callbacks."""
+        return self.data
+
+    @callback
+    def async_handle_bluetooth_event(
+        self,
+        service_info: BluetoothServiceInfoBleak,
+        change: BluetoothChange,
+    ) -> None:
+        """Handle a Bluetooth event from Home Assistant."""
+        _LOGGER.debug(
+            "Received Bluetooth event from %s (change=%s)",
+            service_info.address,
+            change,
+        )
+
+        if self.frame_prefix is None:
+            return
+        expected_mfr_id, expected_prefix = self.frame_prefix
+
+        for mfr_id, mfr_data in service_info.advertisement.manufacturer_data.items():
+            # The MAC is encoded in the manufacturer id and first 4 data bytes
+            if mfr_id != expected_mfr_id or mfr_data[:4] != expected_prefix:
+                # Only this scale's own frames count; others are not rejections
+                if service_info.address == self.mac_address:
+                    self.stats.mac_rejected += 1
+                continue
+
+            if self.async_handle_frame(mfr_data, service_info.rssi):
+                return
+
+    @callback
+    def async_handle_frame(self, mfr_data: bytes, rssi: int | None = None) -> bool:
+        """Handle manufacturer data already matched to this scale."""
+        stats = self.stats
+        stats.adverts += 1
+        stats.last_frame_time = received = time.time()
+        self.frame_log.record(received, rssi, mfr_data)
+        start = time.perf_counter()
+        handled = self._async_process_frame(mfr_data)
+        stats.latency.record(time.perf_counter() - start)
+        return handled
+
+    @callback
+    def _async_process_frame(self, mfr_data: bytes) -> bool:
+        """Decode a frame and update the weigh-in and entities."""
+        stats = self.stats
+        now = time.monotonic()
+        if (
+            mfr_data == self._last_frame
+            and mfr_data[CREDIBILITY_OFFSET] != CREDIBILITY_STABLE
+            and (
+                self.duplicate_window is None
+                or now - self._last_frame_time < self.duplicate_window
+            )
+        ):
+            stats.suppressed += 1
+            return True
+
+        frame = decode_frame(mfr_data)
+        if frame is None:
+            stats.invalid += 1
+            return False
+
+        stats.parsed += 1
+        self._last_frame = bytes(mfr_data)
+        self._last_frame_time = now
+        credibility = frame.credibility
+
+        weigh_in = self.weigh_in
+        if credibility == CREDIBILITY_STABLE:
+            stats.stable += 1
+            if (reading := weigh_in.add_stable(frame, now)) is not None:
+                self._async_finish_weigh_in(reading)
+            if weigh_in.frames == 1:
+                # The first stable frame is delivered right away, unthrottled;
+                # the weigh-in is finalized from the median of all its frames
+                self.async_cancel_pending_update()
+                self._async_push_measurement(
+                    self._stable_measurement(
+                        frame.weight, frame.resistance, frame.count, frame.body_fat
+                    )[1],
+                    now,
+                )
+            if weigh_in.active and self._cancel_weigh_in_timeout is None:
+                self._cancel_weigh_in_timeout = async_call_later(
+                    self.hass, WEIGH_IN_TIMEOUT, self._async_weigh_in_timeout
+                )
+            return True
+
+        # Any other frame ends the stable phase of the current weigh-in,
+        # unless it is a late rebroadcast of an earlier one
+        if (
+            not weigh_in.is_stale(frame.count)
+            and (reading := weigh_in.finish()) is not None
+        ):
+            self._async_finish_weigh_in(reading)
+
+        if credibility == CREDIBILITY_IDLE:
+            stats.idle += 1
+            self.async_cancel_pending_update()
+            self._async_push_measurement(IDLE_MEASUREMENT, now)
+            return True
+
+        stats.measuring += 1
+        measurement = YunmaiMeasurement(
+            ScaleStatus.MEASURING, frame.weight, frame.count
+        )
+        if now - self._last_push_time < self.measuring_interval:
+            # Keep only the latest weight until the interval has passed
+            self._pending_measurement = measurement
+            if self._cancel_pending_update is None:
+                self._cancel_pending_update = async_call_later(
+                    self.hass,
+                    self._last_push_time + self.measuring_interval - now,
+                    self._async_flush_pending_update,
+                )
+            return True
+
+        self._async_push_measurement(measurement, now)
+        return True
+
+    @callback
+    def async_stop(self) -> None:
+        """Cancel pending timers when the entry is unloaded."""
+        self.async_cancel_pending_update()
+        if self._cancel_weigh_in_timeout is not None:
+            self._cancel_weigh_in_timeout()
+            self._cancel_weigh_in_timeout = None
+
+    @callback
+    def _async_weigh_in_timeout(self, _now: Any) -> None:
+        """Finish the weigh-in once no stable frames have arrived for a while."""
+        self._cancel_weigh_in_timeout = None
+        if not self.weigh_in.active:
+            return
+
+        remaining = self.weigh_in.last_frame_time + WEIGH_IN_TIMEOUT - time.monotonic()
+        if remaining > 0:
+            self._cancel_weigh_in_timeout = async_call_later(
+                self.hass, remaining, self._async_weigh_in_timeout
+            )
+            return
+
+        if (reading := self.weigh_in.finish()) is not None:
+            self._async_finish_weigh_in(reading)
+
+    def _match_profile(self, weight: float) -> UserProfile | None:
+        """Return the profile a reading is attributed to, None if unknown."""
+        if (profile := self.profile_index.match(weight)) is not None:
+            return profile
+        # A reading close to no profile's recent weight could be anyone's, so
+        # it is only attributed where it cannot belong to another profile: on
+        # a scale with a single profile, or to the primary profile until it
+        # has a weight to match against
+        if len(self.profiles) == 1 or self.primary_profile.weight is None:
+            return self.primary_profile
+        return None
+
+    def _stable_measurement(
+        self,
+        weight: float,
+        resistance: int,
+        count: int,
+        body_fat: float | None = None,
+    ) -> tuple[UserProfile | None, YunmaiMeasurement]:
+        """
+        Return the profile of a stable reading and its measurement.
+
+        The body composition depends on who stepped on the scale, so readings
+        without a profile only carry their weight.
+        """
+        if (profile := self._match_profile(weight)) is None:
+            return None, YunmaiMeasurement(ScaleStatus.STABLE, weight, count)
+        return profile, profile.stable_measurement(weight, resistance, count, body_fat)
+
+    @callback
+    def _async_finish_weigh_in(self, reading: WeighInReading) -> None:
+        """Compute and publish the measurement of a finished weigh-in."""
+        profile, measurement = self._stable_measurement(
+            reading.weight, reading.resistance, reading.count, reading.body_fat
+        )
+        _LOGGER.debug(
+            "Weigh-in %s of %s finished from %s stable frames for profile %s",
+            reading.count,
+            self.mac_address,
+            reading.frames,
+            measurement.profile,
+        )
+        timestamp = time.time()
+        if profile is not None:
+            self.trends.update(measurement, timestamp)
+        self.async_cancel_pending_update()
+        self._async_push_measurement(measurement, time.monotonic())
+        self.hass.bus.async_fire(
+            EVENT_WEIGH_IN,
+            {CONF_ADDRESS: self.mac_address, **measurement.to_dict()},
+        )
+        if profile is not None:
+            self._async_track_profile_weight(profile, reading.weight)
+        # Unattributed readings are kept with their resistance as well
+        self.history.append(
+            timestamp,
+            reading.weight,
+            reading.resistance,
+            reading.count,
+            measurement.profile,
+            reading.body_fat,
+        )
+        self.hass.async_add_executor_job(self.history.flush)
+        self._async_schedule_sync()
+
+    @callback
+    def _async_schedule_sync(self) -> None:
+        """Start a download of stored readings if one is due."""
+        if (
+            not self.active_sync
+            or self._syncing
+            or time.monotonic() - self._last_sync_time < SYNC_INTERVAL
+        ):
+            return
+        self._syncing = True
+        self.entry.async_create_background_task(
+            self.hass, self.async_sync_history(), f"{DOMAIN} sync {self.mac_address}"
+        )
+
+    async def async_sync_history(self) -> int:
+        """Download the readings stored on the scale into the history."""
+        self._syncing = True
+        try:
+            synced = await HistorySync(self.gatt_client_factory()).async_sync(
+                self._async_persist_stored
+            )
+        except SyncError as err:
+            self.stats.sync_failures += 1
+            _LOGGER.debug("History sync of %s failed: %s", self.mac_address, err)
+            return 0
+        finally:
+            self._syncing = False
+
+        # Only a completed sync waits for the next interval; a scale that was
+        # already asleep is tried again after its next weigh-in
+        self._last_sync_time = time.monotonic()
+        self.stats.synced += synced
+        _LOGGER.debug("Synced %s stored readings of %s", synced, self.mac_address)
+        return synced
+
+    async def _async_persist_stored(self, readings: list[StoredReading]) -> None:
+        """Write downloaded readings to the history before they are acknowledged."""
+        records = []
+        for reading in readings:
+            profile = self._match_profile(reading.weight)
+            records.append(
+                HistoryRecord(
+                    reading.timestamp,
+                    reading.weight,
+                    reading.resistance,
+                    reading.sequence & 0xFF,
+                    profile_id(profile.name if profile is not None else None),
+                )
+            )
+        try:
+            await self.hass.async_add_executor_job(self._merge_new_records, records)
+        except OSError as err:
+            # Not acknowledged, so the scale keeps the readings
+            raise SyncError(f"Failed to store downloaded readings: {err}") from err
+
+    def _merge_new_records(self, records: list[HistoryRecord]) -> None:
+        """Merge records that were not already recorded from advertisements."""
+        history = self.history
+        history.flush()
+        if not records:
+            return
+
+        # Times of the stored weigh-ins around the downloaded readings, keyed
+        # by weight and resistance, so that each reading is looked up with a
+        # bisect from a single read of the history
+        known: dict[tuple[int, int], list[float]] = defaultdict(list)
+        for record in history.iter_range(
+            min(record.timestamp for record in records) - SYNC_MATCH_WINDOW,
+            max(record.timestamp for record in records) + SYNC_MATCH_WINDOW,
+        ):
+            known[round(record.weight * 100), record.resistance].append(
+                record.timestamp
+            )
+
+        new = []
+        for record in records:
+            timestamps = known.get((round(record.weight * 100), record.resistance), [])
+            index = bisect_left(timestamps, record.timestamp - SYNC_MATCH_WINDOW)
+            if (
+                index == len(timestamps)
+                or timestamps[index] >= record.timestamp + SYNC_MATCH_WINDOW
+            ):
+                new.append(record)
+        history.merge(new)
+
+    @callback
+    def _async_track_profile_weight(self, profile: UserProfile, weight: float) -> None:
+        """Move a profile's weight band to its latest reading and persist it."""
+        self.profile_index.update(profile, weight)
+        self._profile_weights[profile.name] = weight
+        self.weights_store.async_delay_save(
+            lambda: self._profile_weights, PROFILE_WEIGHTS_SAVE_DELAY
+        )
+
+    @callback
+    def async_cancel_pending_update(self) -> None:
+        """Drop a coalesced measuring update that has not been pushed yet."""
+        self._pending_measurement = None
+        if self._cancel_pending_update is not None:
+            self._cancel_pending_update()
+            self._cancel_pending_update = None
+
+    @callback
+    def _async_flush_pending_update(self, _now: Any) -> None:
+        """Push the latest coalesced measuring update."""
+        self._cancel_pending_update = None
+        if (measurement := self._pending_measurement) is not None:
+            self._pending_measurement = None
+            self._async_push_measurement(measurement, time.monotonic())
+
+    @callback
+    def _async_push_measurement(
+        self, measurement: YunmaiMeasurement, now: float
+    ) -> None:
+        """Notify entities of a new measurement."""
+        self._last_push_time = now
+        self.changed_keys = self._changed_keys(measurement)
+        self.async_set_updated_data(measurement)
+
+    def _changed_keys(self, measurement: YunmaiMeasurement) -> frozenset[str]:
+        """Return the fields of a measurement that differ from earlier ones."""
+        if self.data is None:
+            # Every entity becomes available with the first measurement
+            changed = set(MEASUREMENT_FIELDS)
+        else:
+            changed = set()
+
+        last_values = self._last_values
+        for key in MEASUREMENT_FIELDS:
+            value = getattr(measurement, key)
+            if value is not None and last_values.get(key) != value:
+                last_values[key] = value
+                changed.add(key)
+
+        return frozenset(changed)
@@ -0,0 +1,58 @@
+"""Diagnostics support for Yunmai Scale."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_ADDRESS
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    CONF_AGE,
+    CONF_GENDER,
+    CONF_HEIGHT,
+    CONF_IS_ACTIVE,
+    CONF_PROFILE_WEIGHTS,
+    CONF_PROFILES,
+    DATA_DISPATCHER,
+    DOMAIN,
+)
+from .parse_data import MEASUREMENT_FIELDS
+
+# Personal data of the users and the scale's address, and the body
+# measurements and profile of the latest weigh-in
+TO_REDACT = {
+    CONF_ADDRESS,
+    CONF_AGE,
+    CONF_GENDER,
+    CONF_HEIGHT,
+    CONF_IS_ACTIVE,
+    CONF_PROFILES,
+    CONF_PROFILE_WEIGHTS,
+    *(key for key in MEASUREMENT_FIELDS if key not in ("status", "count")),
+}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    dispatcher = hass.data[DOMAIN][DATA_DISPATCHER]
+
+    return {
+        "entry": {
+            "data": async_redact_data(entry.data, TO_REDACT),
+            "options": async_redact_data(entry.options, TO_REDACT),
+        },
+        "data": (
+            async_redact_data(coordinator.data.to_dict(), TO_REDACT)
+            if coordinator.data is not None
+            else None
+        ),
+        "coordinator": coordinator.stats.as_dict(),
+        "dispatcher": dispatcher.stats.as_dict(),
+        "raw_frames": coordinator.frame_log.as_dict(),
+    }
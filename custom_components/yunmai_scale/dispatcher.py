@@ -0,0 +1,105 @@
+"""Shared Bluetooth dispatcher for Yunmai Scale coordinators."""
+
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING
+
+from homeassistant.components.bluetooth import (
+    BluetoothCallbackMatcher,
+    BluetoothChange,
+    BluetoothScanningMode,
+    BluetoothServiceInfoBleak,
+    async_register_callback,
+)
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+from .const import SERVICE_UUID
+from .stats import DispatcherStats
+
+if TYPE_CHECKING:
+    from .coordinator import YunmaiDataCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class YunmaiDispatcher:
+    """Route Yunmai advertisements to the coordinator of the sending scale."""
+
+    def __init__(self, hass: HomeAssistant, register_callback: bool = True) -> None:
+        """Initialize the dispatcher.
+
+        :param register_callback: Register with the Bluetooth integration;
+            disable to feed advertisements to async_handle_bluetooth_event directly
+        """
+        self.hass = hass
+        self._register_callback = register_callback
+        self._coordinators: dict[tuple[int, bytes], YunmaiDataCoordinator] = {}
+        # Coordinators by the address advertisements are sent from, to count
+        # frames of a configured scale that do not carry its MAC
+        self._addresses: dict[str, YunmaiDataCoordinator] = {}
+        self._cancel_callback: CALLBACK_TYPE | None = None
+        self.stats = DispatcherStats()
+
+    @callback
+    def async_add_coordinator(
+        self, coordinator: YunmaiDataCoordinator
+    ) -> CALLBACK_TYPE:
+        """Register a coordinator and return a callback that removes it."""
+        frame_prefix = coordinator.frame_prefix
+        if frame_prefix is None:
+            _LOGGER.warning(
+                "Cannot route advertisements for invalid address %s",
+                coordinator.mac_address,
+            )
+            return lambda: None
+
+        self._coordinators[frame_prefix] = coordinator
+        address = coordinator.mac_address.upper()
+        self._addresses[address] = coordinator
+        if self._register_callback and self._cancel_callback is None:
+            self._cancel_callback = async_register_callback(
+                self.hass,
+                self.async_handle_bluetooth_event,
+                BluetoothCallbackMatcher(service_uuid=SERVICE_UUID),
+                BluetoothScanningMode.PASSIVE,
+            )
+
+        @callback
+        def _async_remove_coordinator() -> None:
+            if self._coordinators.get(frame_prefix) is coordinator:
+                del self._coordinators[frame_prefix]
+            if self._addresses.get(address) is coordinator:
+                del self._addresses[address]
+            if not self._coordinators and self._cancel_callback is not None:
+                self._cancel_callback()
+                self._cancel_callback = None
+
+        return _async_remove_coordinator
+
+    @callback
+    def async_handle_bluetooth_event(
+        self,
+        service_info: BluetoothServiceInfoBleak,
+        change: BluetoothChange,
+    ) -> None:
+        """Handle a Bluetooth event and forward it to the matching coordinator."""
+        coordinators = self._coordinators
+        stats = self.stats
+        stats.adverts += 1
+        routed = False
+        for mfr_id, mfr_data in service_info.advertisement.manufacturer_data.items():
+            # The MAC is encoded in the manufacturer id and first 4 data bytes
+            coordinator = coordinators.get((mfr_id, mfr_data[:4]))
+            if coordinator is None:
+                continue
+            routed = True
+            if coordinator.async_handle_frame(mfr_data, service_info.rssi):
+                break
+
+        if routed:
+            stats.routed += 1
+            return
+        stats.unrouted += 1
+        if (coordinator := self._addresses.get(service_info.address)) is not None:
+            coordinator.stats.mac_rejected += 1
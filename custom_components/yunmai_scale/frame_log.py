@@ -0,0 +1,91 @@
+"""Fixed-size log of the latest raw frames of a scale, for diagnostics."""
+
+from __future__ import annotations
+
+import struct
+from collections.abc import Iterator
+from typing import Any, NamedTuple
+
+from .const import FRAME_LOG_SIZE
+from .parse_data import MAX_FRAME_LENGTH, PROTOCOL_OFFSET
+
+# timestamp(8) rssi(1) data length(1), then data zero-padded to the longest frame
+ENTRY_STRUCT = struct.Struct(f"<dbB{MAX_FRAME_LENGTH}s")
+ENTRY_SIZE = ENTRY_STRUCT.size
+# Stored when the RSSI is not known; real readings are clamped below it
+RSSI_UNKNOWN = 127
+# Frames start with four bytes of the scale's MAC address, which diagnostics
+# replace with this
+MASKED_MAC = "**" * PROTOCOL_OFFSET
+
+
+class LoggedFrame(NamedTuple):
+    """Raw frame as received."""
+
+    timestamp: float  # seconds since the epoch
+    rssi: int | None
+    mfr_data: bytes
+
+
+class FrameLog:
+    """Ring buffer of raw frames in a single preallocated bytearray.
+
+    A frame is packed in place into the oldest slot, so recording allocates
+    nothing and memory stays fixed however often the scale advertises.
+    Frames longer than MAX_FRAME_LENGTH are truncated.
+    """
+
+    __slots__ = ("_buffer", "_next", "capacity", "recorded")
+
+    def __init__(self, capacity: int = FRAME_LOG_SIZE) -> None:
+        """Initialize the log."""
+        self.capacity = capacity
+        self._buffer = bytearray(capacity * ENTRY_SIZE)
+        self._next = 0  # slot written next
+        self.recorded = 0  # frames recorded since startup
+
+    def record(self, timestamp: float, rssi: int | None, mfr_data: bytes) -> None:
+        """Store a frame, overwriting the oldest one once full."""
+        ENTRY_STRUCT.pack_into(
+            self._buffer,
+            self._next * ENTRY_SIZE,
+            timestamp,
+            RSSI_UNKNOWN if rssi is None else max(-128, min(RSSI_UNKNOWN - 1, rssi)),
+            min(len(mfr_data), MAX_FRAME_LENGTH),
+            mfr_data,
+        )
+        self._next += 1
+        if self._next == self.capacity:
+            self._next = 0
+        self.recorded += 1
+
+    def __len__(self) -> int:
+        """Return the number of frames held."""
+        return min(self.recorded, self.capacity)
+
+    def __iter__(self) -> Iterator[LoggedFrame]:
+        """Iterate over the frames held, oldest first."""
+        held = len(self)
+        start = (self._next - held) % self.capacity
+        for i in range(held):
+            timestamp, rssi, length, data = ENTRY_STRUCT.unpack_from(
+                self._buffer, ((start + i) % self.capacity) * ENTRY_SIZE
+            )
+            yield LoggedFrame(
+                timestamp, None if rssi == RSSI_UNKNOWN else rssi, data[:length]
+            )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the frames for diagnostics, with the MAC address bytes masked."""
+        return {
+            "capacity": self.capacity,
+            "recorded": self.recorded,
+            "frames": [
+                {
+                    "timestamp": frame.timestamp,
+                    "rssi": frame.rssi,
+                    "data": MASKED_MAC + frame.mfr_data[PROTOCOL_OFFSET:].hex(),
+                }
+                for frame in self
+            ],
+        }
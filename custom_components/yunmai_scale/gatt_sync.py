@@ -0,0 +1,260 @@
+"""Active download of the measurements stored on a Yunmai scale.
+
+The scale keeps the weigh-ins it could not hand to anyone. Over a GATT
+connection they are requested page by page; each page is persisted before
+it is acknowledged, after which the scale drops the acknowledged readings.
+All pages of a sync are transferred over a single connection.
+
+Messages are framed as header(1) length(1) command(1) payload checksum(1),
+the checksum being the XOR of the bytes between header and checksum.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import struct
+from collections.abc import Awaitable, Callable
+from functools import reduce
+from operator import xor
+from typing import TYPE_CHECKING, NamedTuple, Protocol
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+_LOGGER = logging.getLogger(__name__)
+
+WRITE_CHARACTERISTIC = "0000ffe9-0000-1000-8000-00805f9b34fb"
+NOTIFY_CHARACTERISTIC = "0000ffe4-0000-1000-8000-00805f9b34fb"
+
+MESSAGE_HEADER = 0x0D
+CMD_READ_HISTORY = 0x17
+CMD_ACK_HISTORY = 0x18
+CMD_HISTORY_END = 0x19
+
+# sequence(2) timestamp(4) weight in 10 g(2) resistance(2)
+HISTORY_RECORD_STRUCT = struct.Struct(">HIHH")
+# highest sequence persisted(2)
+ACK_STRUCT = struct.Struct(">H")
+# readings still stored after this page(2)
+END_STRUCT = struct.Struct(">H")
+
+# Seconds to wait for the next message of a page
+RESPONSE_TIMEOUT = 10.0
+
+
+class SyncError(Exception):
+    """Error talking to the scale."""
+
+
+class StoredReading(NamedTuple):
+    """Weigh-in stored on the scale."""
+
+    sequence: int
+    timestamp: float  # seconds since the epoch
+    weight: float  # kg
+    resistance: int
+
+
+class GattClient(Protocol):
+    """Connection to a scale; implemented over Bleak and by a fake for testing."""
+
+    @property
+    def is_connected(self) -> bool:
+        """Return True while connected."""
+
+    async def connect(self) -> None:
+        """Connect to the scale."""
+
+    async def disconnect(self) -> None:
+        """Disconnect from the scale."""
+
+    async def start_notify(
+        self, characteristic: str, callback: Callable[[bytes], None]
+    ) -> None:
+        """Call callback with every notification of a characteristic."""
+
+    async def stop_notify(self, characteristic: str) -> None:
+        """Stop notifications of a characteristic."""
+
+    async def write(self, characteristic: str, data: bytes) -> None:
+        """Write to a characteristic."""
+
+
+def encode_message(command: int, payload: bytes = b"") -> bytes:
+    """Frame a command and its payload."""
+    body = bytes((len(payload) + 4, command)) + payload
+    return bytes((MESSAGE_HEADER,)) + body + bytes((reduce(xor, body, 0),))
+
+
+def decode_message(data: bytes) -> tuple[int, bytes]:
+    """
+    Unframe a message.
+
+    :param data: Message as received
+    :return: (command, payload)
+    :raises SyncError: If the message is malformed
+    """
+    if (
+        len(data) < 4
+        or data[0] != MESSAGE_HEADER
+        or data[1] != len(data)
+        or reduce(xor, data[1:-1], 0) != data[-1]
+    ):
+        raise SyncError(f"Malformed message {data.hex()}")
+    return data[2], data[3:-1]
+
+
+class HistorySync:
+    """Download the readings stored on a scale over one connection."""
+
+    def __init__(self, client: GattClient) -> None:
+        """Initialize the sync."""
+        self.client = client
+        self.connections = 0
+        self._messages: asyncio.Queue[bytes] = asyncio.Queue()
+
+    async def async_sync(
+        self, persist: Callable[[list[StoredReading]], Awaitable[None]]
+    ) -> int:
+        """
+        Download, persist and acknowledge all stored readings.
+
+        :param persist: Stores a page of readings; acknowledged once it returns
+        :return: Number of readings downloaded
+        """
+        client = self.client
+        if not client.is_connected:
+            await client.connect()
+            self.connections += 1
+        try:
+            await client.start_notify(NOTIFY_CHARACTERISTIC, self._messages.put_nowait)
+            downloaded = 0
+            while True:
+                await client.write(
+                    WRITE_CHARACTERISTIC, encode_message(CMD_READ_HISTORY)
+                )
+                readings, remaining = await self._async_receive_page()
+                if readings:
+                    await persist(readings)
+                    await client.write(
+                        WRITE_CHARACTERISTIC,
+                        encode_message(
+                            CMD_ACK_HISTORY, ACK_STRUCT.pack(readings[-1].sequence)
+                        ),
+                    )
+                    downloaded += len(readings)
+                if not remaining or not readings:
+                    return downloaded
+        finally:
+            if client.is_connected:
+                try:
+                    await client.disconnect()
+                except SyncError as err:
+                    # Acknowledged readings are persisted either way
+                    _LOGGER.debug("Failed to disconnect after sync: %s", err)
+
+    async def _async_receive_page(self) -> tuple[list[StoredReading], int]:
+        """Collect the readings of a page until its end message."""
+        readings = []
+        while True:
+            try:
+                data = await asyncio.wait_for(self._messages.get(), RESPONSE_TIMEOUT)
+            except TimeoutError as err:
+                raise SyncError("Timed out waiting for the scale") from err
+
+            command, payload = decode_message(data)
+            if command == CMD_HISTORY_END:
+                if len(payload) < END_STRUCT.size:
+                    raise SyncError(f"Truncated end of page {data.hex()}")
+                return readings, END_STRUCT.unpack_from(payload)[0]
+            if command == CMD_READ_HISTORY:
+                if len(payload) < HISTORY_RECORD_STRUCT.size:
+                    raise SyncError(f"Truncated stored reading {data.hex()}")
+                sequence, timestamp, weight, resistance = (
+                    HISTORY_RECORD_STRUCT.unpack_from(payload)
+                )
+                readings.append(
+                    StoredReading(sequence, float(timestamp), weight * 0.01, resistance)
+                )
+
+
+class BleakGattClient:
+    """GATT client of a scale connected through Home Assistant's Bluetooth stack."""
+
+    def __init__(self, hass: HomeAssistant, address: str) -> None:
+        """Initialize the client."""
+        self.hass = hass
+        self.address = address
+        self._client = None
+
+    @property
+    def is_connected(self) -> bool:
+        """Return True while connected."""
+        return self._client is not None and self._client.is_connected
+
+    async def connect(self) -> None:
+        """Connect to the scale, which is only reachable while awake."""
+        from bleak.exc import BleakError
+        from bleak_retry_connector import (
+            BleakClientWithServiceCache,
+            establish_connection,
+        )
+        from homeassistant.components.bluetooth import async_ble_device_from_address
+
+        device = async_ble_device_from_address(
+            self.hass, self.address, connectable=True
+        )
+        if device is None:
+            raise SyncError(f"{self.address} is not reachable by a connectable adapter")
+        try:
+            self._client = await establish_connection(
+                BleakClientWithServiceCache, device, self.address
+            )
+        except (BleakError, TimeoutError) as err:
+            raise SyncError(f"Failed to connect to {self.address}: {err}") from err
+
+    async def disconnect(self) -> None:
+        """Disconnect from the scale."""
+        from bleak.exc import BleakError
+
+        if self._client is None:
+            return
+        client, self._client = self._client, None
+        try:
+            await client.disconnect()
+        except (BleakError, TimeoutError) as err:
+            raise SyncError(f"Failed to disconnect from {self.address}: {err}") from err
+
+    async def start_notify(
+        self, characteristic: str, callback: Callable[[bytes], None]
+    ) -> None:
+        """Call callback with every notification of a characteristic."""
+        from bleak.exc import BleakError
+
+        try:
+            await self._client.start_notify(
+                characteristic, lambda _sender, data: callback(bytes(data))
+            )
+        except BleakError as err:
+            raise SyncError(f"Failed to subscribe to {self.address}: {err}") from err
+
+    async def stop_notify(self, characteristic: str) -> None:
+        """Stop notifications of a characteristic."""
+        from bleak.exc import BleakError
+
+        try:
+            await self._client.stop_notify(characteristic)
+        except BleakError as err:
+            raise SyncError(
+                f"Failed to unsubscribe from {self.address}: {err}"
+            ) from err
+
+    async def write(self, characteristic: str, data: bytes) -> None:
+        """Write to a characteristic."""
+        from bleak.exc import BleakError
+
+        try:
+            await self._client.write_gatt_char(characteristic, data, response=True)
+        except BleakError as err:
+            raise SyncError(f"Failed to write to {self.address}: {err}") from err
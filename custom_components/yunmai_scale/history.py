@@ -0,0 +1,224 @@
+"""Append-only binary history of Yunmai scale measurements."""
+
+from __future__ import annotations
+
+import mmap
+import struct
+import threading
+import zlib
+from collections.abc import Iterator
+from operator import itemgetter
+from pathlib import Path
+from typing import NamedTuple
+
+# timestamp(8) weight in 10 g(2) resistance(2) count(1) pad(1) profile id(4)
+# body fat reported by the scale in 0.01 %, 0 if computed(2)
+RECORD_STRUCT = struct.Struct("<dHHBxIH")
+RECORD_SIZE = RECORD_STRUCT.size
+HISTORY_SUFFIX = ".history2"
+# Files written before the reported body fat was stored
+LEGACY_RECORD_STRUCT = struct.Struct("<dHHBxI")
+LEGACY_SUFFIX = ".history"
+
+
+class HistoryRecord(NamedTuple):
+    """Single stored measurement."""
+
+    timestamp: float  # seconds since the epoch
+    weight: float  # kg
+    resistance: int
+    count: int
+    profile_id: int
+    body_fat: float | None = None  # reported by the scale, in %
+
+
+def profile_id(name: str | None) -> int:
+    """Return the stable numeric id stored for a profile name."""
+    return zlib.crc32(name.encode()) if name else 0
+
+
+class MeasurementHistory:
+    """Fixed-width measurement log of one scale.
+
+    Records are appended to an in-memory buffer, which is cheap enough to do
+    from the event loop, and written to disk by flush() in an executor.
+    Stored records are read through mmap, so random access and range reads
+    do not load the whole file.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Initialize the history."""
+        self.path = path
+        self._buffer = bytearray()
+        self._lock = threading.Lock()
+        # Held while writing, so flushes do not interleave with a merge;
+        # separate from _lock so appends never wait for disk I/O
+        self._file_lock = threading.Lock()
+
+    def append(
+        self,
+        timestamp: float,
+        weight: float,
+        resistance: int,
+        count: int,
+        profile: str | None = None,
+        body_fat: float | None = None,
+    ) -> None:
+        """Buffer a measurement; call flush() to persist it."""
+        record = RECORD_STRUCT.pack(
+            timestamp,
+            round(weight * 100),
+            resistance,
+            count,
+            profile_id(profile),
+            _pack_body_fat(body_fat),
+        )
+        with self._lock:
+            self._buffer += record
+
+    def flush(self) -> None:
+        """Write buffered records to disk; does blocking I/O."""
+        with self._lock:
+            if not self._buffer:
+                return
+            data = bytes(self._buffer)
+            self._buffer.clear()
+
+        with self._file_lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("ab") as file:
+                file.write(data)
+
+    def merge(self, records: list[HistoryRecord]) -> None:
+        """
+        Write older records, e.g. downloaded from the scale, in time order.
+
+        Only the stored records from the oldest new one onwards are read
+        and rewritten, which is the short tail since the last download.
+        Does blocking I/O.
+        """
+        if not records:
+            return
+        self.flush()
+        records = sorted(records, key=itemgetter(0))
+        with self._file_lock:
+            with self._map() as view:
+                total = len(view) // RECORD_SIZE
+                start = total
+                while (
+                    start
+                    and RECORD_STRUCT.unpack_from(view, (start - 1) * RECORD_SIZE)[0]
+                    > records[0].timestamp
+                ):
+                    start -= 1
+                tail = [_unpack(view, index) for index in range(start, total)]
+
+            merged = bytearray()
+            for record in sorted(tail + records, key=itemgetter(0)):
+                merged += RECORD_STRUCT.pack(
+                    record.timestamp,
+                    round(record.weight * 100),
+                    record.resistance,
+                    record.count,
+                    record.profile_id,
+                    _pack_body_fat(record.body_fat),
+                )
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("r+b" if self.path.exists() else "wb") as file:
+                file.seek(start * RECORD_SIZE)
+                file.write(merged)
+
+    def migrate(self) -> None:
+        """
+        Convert a history file of the legacy layout next to this one.
+
+        The legacy file is removed once its records are written in the
+        current layout. Does blocking I/O.
+        """
+        legacy_path = self.path.with_suffix(LEGACY_SUFFIX)
+        if self.path.exists() or not legacy_path.exists():
+            return
+        data = legacy_path.read_bytes()
+        data = data[: len(data) - len(data) % LEGACY_RECORD_STRUCT.size]
+        converted = bytearray()
+        for fields in LEGACY_RECORD_STRUCT.iter_unpack(data):
+            converted += RECORD_STRUCT.pack(*fields, 0)
+        temp_path = self.path.with_suffix(".tmp")
+        temp_path.write_bytes(converted)
+        temp_path.replace(self.path)
+        legacy_path.unlink()
+
+    def __len__(self) -> int:
+        """Return the number of stored records, excluding buffered ones."""
+        try:
+            return self.path.stat().st_size // RECORD_SIZE
+        except FileNotFoundError:
+            return 0
+
+    def __getitem__(self, index: int) -> HistoryRecord:
+        """Return a stored record by position."""
+        with self._map() as view:
+            total = len(view) // RECORD_SIZE
+            if index < 0:
+                index += total
+            if not 0 <= index < total:
+                raise IndexError("history index out of range")
+            return _unpack(view, index)
+
+    def iter_range(
+        self, start: float | None = None, end: float | None = None
+    ) -> Iterator[HistoryRecord]:
+        """
+        Stream stored records with start <= timestamp < end.
+
+        Records are appended in time order, so the first record is found
+        with a binary search over the file.
+        """
+        with self._map() as view:
+            total = len(view) // RECORD_SIZE
+            lo = 0
+            if start is not None:
+                hi = total
+                while lo < hi:
+                    mid = (lo + hi) // 2
+                    if RECORD_STRUCT.unpack_from(view, mid * RECORD_SIZE)[0] < start:
+                        lo = mid + 1
+                    else:
+                        hi = mid
+            for index in range(lo, total):
+                record = _unpack(view, index)
+                if end is not None and record.timestamp >= end:
+                    return
+                yield record
+
+    def tail(self, count: int) -> list[HistoryRecord]:
+        """Return the last stored records, oldest first."""
+        with self._map() as view:
+            total = len(view) // RECORD_SIZE
+            return [
+                _unpack(view, index) for index in range(max(0, total - count), total)
+            ]
+
+    def _map(self) -> mmap.mmap | memoryview:
+        """Map the stored records read-only."""
+        try:
+            with self.path.open("rb") as file:
+                return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError):
+            # Missing or empty files cannot be mapped
+            return memoryview(b"")
+
+
+def _unpack(view: mmap.mmap | memoryview, index: int) -> HistoryRecord:
+    """Unpack the record at a position."""
+    timestamp, weight, resistance, count, profile, fat = RECORD_STRUCT.unpack_from(
+        view, index * RECORD_SIZE
+    )
+    return HistoryRecord(
+        timestamp, weight * 0.01, resistance, count, profile, fat * 0.01 or None
+    )
+
+
+def _pack_body_fat(body_fat: float | None) -> int:
+    """Return the stored value of a reported body fat."""
+    return 0 if body_fat is None else round(body_fat * 100)
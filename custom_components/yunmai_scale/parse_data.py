@@ -1,6 +1,325 @@
 """Parse data from Yunmai scale advertisements."""
 
-from .yunmai_lib import YmLib
+from __future__ import annotations
+
+import struct
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, fields
+from enum import StrEnum
+from typing import Any, NamedTuple
+
+from .yunmai_kernel import compile_profile
+
+# mac_suffix(4) identifier(3) count(1) credibility(1) weight(2) resistance(2)
+FRAME_STRUCT = struct.Struct(">4s3sBBHH")
+FRAME_LENGTH = FRAME_STRUCT.size
+# Newer firmware appends the body fat it measured itself: fat in 0.01 %(2)
+FAT_FRAME_STRUCT = struct.Struct(">4s3sBBHHH")
+MAX_FRAME_LENGTH = FAT_FRAME_STRUCT.size
+
+# The first two identifier bytes select the layout of a frame
+PROTOCOL_OFFSET = 4
+VERSION_OFFSET = 5
+CREDIBILITY_OFFSET = 8
+PROTOCOL_ADVERTISEMENT = 0x00
+# Versions whose frames append the body fat the scale measured itself.
+# YmLib.get_fat is only for "< 0x1e version devices", but the layout of newer
+# frames is not confirmed by a capture yet, so no version is listed and all
+# frames have their body fat computed from the resistance
+REPORTED_FAT_VERSIONS: tuple[int, ...] = ()
+# Reported body fat outside this range is discarded and computed from the
+# resistance instead, like YmLib.get_fat discards its own out-of-range results
+MIN_BODY_FAT = 5.0
+MAX_BODY_FAT = 75.0
+
+CREDIBILITY_IDLE = 0x00
+CREDIBILITY_STABLE = 0x03
+
+
+class YunmaiFrame(NamedTuple):
+    """Decoded fields of a Yunmai manufacturer data frame."""
+
+    mac_suffix: bytes
+    identifier: bytes
+    count: int
+    credibility: int  # 可信度 3为最稳定读数、00为称重结束
+    weight: float  # 精确到0.01公斤（10克） 单位kg
+    resistance: int  # 阻抗值应<3000（0x0BB8）
+    body_fat: float | None = None  # reported by newer firmware, in %
+
+
+class ScaleStatus(StrEnum):
+    """Status of the scale reported by a frame."""
+
+    IDLE = "idle"
+    MEASURING = "measuring"
+    STABLE = "stable"
+
+
+@dataclass(frozen=True, slots=True)
+class YunmaiMeasurement:
+    """Measurement decoded from a single frame.
+
+    Idle frames only carry a status, measuring frames add weight and count,
+    and stable frames carry all body composition metrics.
+    """
+
+    status: ScaleStatus = ScaleStatus.IDLE
+    weight: float | None = None
+    count: int | None = None
+    bmi: float | None = None
+    body_fat: float | None = None
+    muscle_mass: float | None = None
+    water_percentage: float | None = None
+    bone_mass: float | None = None
+    skeletal_muscle: float | None = None
+    lean_body_mass: float | None = None
+    visceral_fat: int | None = None
+    profile: str | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the measurement in the legacy process_data dict format."""
+        data = {
+            "weight": self.weight,
+            "bmi": self.bmi,
+            "body_fat": self.body_fat,
+            "muscle_mass": self.muscle_mass,
+            "water_percentage": self.water_percentage,
+            "bone_mass": self.bone_mass,
+            "skeletal_muscle": self.skeletal_muscle,
+            "lean_body_mass": self.lean_body_mass,
+            "visceral_fat": self.visceral_fat,
+            "status": self.status.value,
+            "count": self.count,
+            "profile": self.profile,
+        }
+        return {key: value for key, value in data.items() if value is not None}
+
+
+MEASUREMENT_FIELDS = tuple(field.name for field in fields(YunmaiMeasurement))
+IDLE_MEASUREMENT = YunmaiMeasurement(ScaleStatus.IDLE)
+
+
+def compute_metrics(
+    weight: float,
+    resistance: int,
+    age: int,
+    sex: int,
+    height: float,
+    is_active: bool,
+    body_fat: float | None = None,
+) -> dict:
+    """
+    Calculate the body composition metrics of a stable reading.
+
+    :param weight: Weight in kg
+    :param resistance: Raw resistance value
+    :param age: User age
+    :param sex: User gender (1 for male, 0 for female)
+    :param height: User height in cm
+    :param is_active: Whether the user has an active lifestyle
+    :param body_fat: Body fat reported by the scale, computed if None
+    :return: Dictionary with rounded body composition metrics
+    """
+    return compile_profile(sex, height, is_active)(weight, resistance, age, body_fat)
+
+
+def mac_to_frame_prefix(address: str) -> tuple[int, bytes] | None:
+    """
+    Convert a MAC address into the manufacturer id and data prefix it is sent as.
+
+    The scale advertises its MAC little-endian: the two low bytes as the
+    manufacturer id, followed by the remaining four bytes of the address.
+
+    :param address: MAC address in the format XX:XX:XX:XX:XX:XX
+    :return: (manufacturer id, 4-byte data prefix), or None if not a MAC
+    """
+    try:
+        raw = bytes.fromhex(address.replace(":", ""))
+    except ValueError:
+        return None
+    if len(raw) != 6:
+        return None
+
+    raw = raw[::-1]
+    return int.from_bytes(raw[:2], "little"), raw[2:]
+
+
+def frame_to_mac(mfr_id: int, data: bytes | bytearray | memoryview) -> str:
+    """
+    Return the MAC address of the scale that sent a frame.
+
+    :param mfr_id: Manufacturer id of the advertisement
+    :param data: Manufacturer data bytes (without the manufacturer id)
+    :return: MAC address in the format XX:XX:XX:XX:XX:XX
+    """
+    raw = mfr_id.to_bytes(2, "little") + bytes(data[:4])
+    return raw[::-1].hex(":").upper()
+
+
+class FrameVariant(NamedTuple):
+    """Layout of one frame variant and how to decode it."""
+
+    name: str
+    min_length: int
+    decode: Callable[[bytes | bytearray | memoryview], YunmaiFrame]
+
+
+def _decode_legacy(data: bytes | bytearray | memoryview) -> YunmaiFrame:
+    """Decode a frame whose body fat is computed from the resistance."""
+    mac_suffix, identifier, count, credibility, weight, resistance = (
+        FRAME_STRUCT.unpack_from(data)
+    )
+    return YunmaiFrame(
+        mac_suffix, identifier, count, credibility, weight * 0.01, resistance
+    )
+
+
+def _decode_reported_fat(data: bytes | bytearray | memoryview) -> YunmaiFrame:
+    """Decode a frame of firmware that reports body fat, if it carries one."""
+    if len(data) < FAT_FRAME_STRUCT.size:
+        # Frames without a measurement, such as idle ones, may be short
+        return _decode_legacy(data)
+    mac_suffix, identifier, count, credibility, weight, resistance, fat = (
+        FAT_FRAME_STRUCT.unpack_from(data)
+    )
+    fat *= 0.01
+    return YunmaiFrame(
+        mac_suffix,
+        identifier,
+        count,
+        credibility,
+        weight * 0.01,
+        resistance,
+        fat if MIN_BODY_FAT <= fat <= MAX_BODY_FAT else None,
+    )
+
+
+LEGACY_VARIANT = FrameVariant("legacy", FRAME_LENGTH, _decode_legacy)
+REPORTED_FAT_VARIANT = FrameVariant("reported_fat", FRAME_LENGTH, _decode_reported_fat)
+
+# Variant per protocol byte, then per version byte; both are looked up by
+# index, so the layout of a frame is found in constant time
+_LEGACY_VERSIONS = (LEGACY_VARIANT,) * 256
+_FRAME_VARIANTS: dict[int, tuple[FrameVariant, ...]] = {}
+
+
+def register_frame_variant(
+    protocol: int, versions: Iterable[int], variant: FrameVariant
+) -> None:
+    """
+    Decode the frames of a protocol and range of versions with a variant.
+
+    :param protocol: Protocol byte of the frames
+    :param versions: Version bytes the variant applies to
+    :param variant: Layout and decoder of the frames
+    """
+    table = list(_FRAME_VARIANTS.get(protocol, _LEGACY_VERSIONS))
+    for version in versions:
+        table[version] = variant
+    _FRAME_VARIANTS[protocol] = tuple(table)
+
+
+register_frame_variant(
+    PROTOCOL_ADVERTISEMENT, REPORTED_FAT_VERSIONS, REPORTED_FAT_VARIANT
+)
+
+
+def frame_variant(data: bytes | bytearray | memoryview) -> FrameVariant:
+    """Return the variant of a frame of at least FRAME_LENGTH bytes."""
+    return _FRAME_VARIANTS.get(data[PROTOCOL_OFFSET], _LEGACY_VERSIONS)[
+        data[VERSION_OFFSET]
+    ]
+
+
+def decode_frame(data: bytes | bytearray | memoryview) -> YunmaiFrame | None:
+    """
+    Decode raw manufacturer data without intermediate hex strings.
+
+    :param data: Manufacturer data bytes (without the manufacturer id)
+    :return: Decoded frame, or None if the data is too short
+    """
+    if len(data) < FRAME_LENGTH:
+        return None
+
+    variant = frame_variant(data)
+    if len(data) < variant.min_length:
+        return None
+    return variant.decode(data)
+
+
+def process_frame(
+    data: bytes | bytearray | memoryview,
+    age: int = 25,
+    sex: int = 1,
+    height: float = 170,
+    is_active: bool = False,
+) -> YunmaiMeasurement | None:
+    """
+    Process the raw advertisement bytes from Yunmai scale.
+
+    :param data: Manufacturer data bytes (without the manufacturer id)
+    :param age: User age
+    :param sex: User gender (1 for male, 0 for female)
+    :param height: User height in cm
+    :param is_active: Whether the user has an active lifestyle
+    :return: Processed scale measurement, or None if the data is invalid
+    """
+    frame = decode_frame(data)
+    if frame is None:
+        return None
+
+    credibility = frame.credibility
+
+    # If status is not reliable, only return weight data
+    if credibility == CREDIBILITY_IDLE:
+        return IDLE_MEASUREMENT
+
+    if credibility != CREDIBILITY_STABLE:
+        return YunmaiMeasurement(ScaleStatus.MEASURING, frame.weight, frame.count)
+
+    # For stable measurements, calculate all metrics
+    return stable_measurement(
+        frame.weight,
+        frame.resistance,
+        frame.count,
+        age,
+        sex,
+        height,
+        is_active,
+        body_fat=frame.body_fat,
+    )
+
+
+def stable_measurement(
+    weight: float,
+    resistance: int,
+    count: int,
+    age: int = 25,
+    sex: int = 1,
+    height: float = 170,
+    is_active: bool = False,
+    profile: str | None = None,
+    body_fat: float | None = None,
+) -> YunmaiMeasurement:
+    """
+    Build the stable measurement of a reading with all body composition metrics.
+
+    :param weight: Weight in kg
+    :param resistance: Raw resistance value
+    :param count: Weigh-in count reported by the scale
+    :param age: User age
+    :param sex: User gender (1 for male, 0 for female)
+    :param height: User height in cm
+    :param is_active: Whether the user has an active lifestyle
+    :param profile: Name of the profile the reading is attributed to
+    :param body_fat: Body fat reported by the scale, computed if None
+    :return: Stable scale measurement
+    """
+    metrics = compute_metrics(weight, resistance, age, sex, height, is_active, body_fat)
+    return YunmaiMeasurement(
+        ScaleStatus.STABLE, weight, count, **metrics, profile=profile
+    )
 
 
 def process_data(
@@ -16,48 +335,13 @@ def process_data(
     :param is_active: Whether the user has an active lifestyle
     :return: Dictionary with processed scale measurements
     """
-    if not data or len(data) < 26:
+    if not data or len(data) < FRAME_LENGTH * 2:
         return {}
 
-    mac_suffix = data[:8]
-    identifier = data[8:14]
-    count = int(data[14:16], 16)
-    credibility = data[16:18]  # 可信度 3为最稳定读数、00为称重结束
-    weight = int(data[18:22], 16) * 0.01  # 精确到0.01公斤（10克） 单位kg
-    resistance = int((data[22:26]), 16)  # 阻抗值应<3000（0x0BB8）
-
-    # If status is not reliable, only return weight data
-    if credibility == '00':
-        return {'status': 'idle'}
-
-    if credibility and credibility != '03':
-        return {
-            'weight': weight,
-            'count': count,
-            'status': 'measuring',
-        }
+    try:
+        raw = bytes.fromhex(data[: min(len(data) // 2, MAX_FRAME_LENGTH) * 2])
+    except ValueError:
+        return {}
 
-    # For stable measurements, calculate all metrics
-    scale = YmLib(sex, height, is_active)
-    bmi = scale.get_bmi(weight)
-    fat = scale.get_fat(age, weight, resistance)
-    muscle = scale.get_muscle(fat)
-    water = scale.get_water(fat)
-    bone_mass = scale.get_bone_mass(muscle, weight)
-    skeletal_muscle = scale.get_skeletal_muscle(fat)
-    lean_body_mass = scale.get_lean_body_mass(weight, fat)
-    visceral_fat = scale.get_visceral_fat(fat, age)
-
-    return {
-        'weight': weight,
-        'bmi': round(bmi, 1),
-        'body_fat': round(fat, 1),
-        'muscle_mass': round(muscle, 1),
-        'water_percentage': round(water, 1),
-        'bone_mass': round(bone_mass, 1),
-        'skeletal_muscle': round(skeletal_muscle, 1),
-        'lean_body_mass': round(lean_body_mass, 1),
-        'visceral_fat': round(visceral_fat),
-        'status': 'stable',
-        'count': count,
-    }
+    measurement = process_frame(raw, age, sex, height, is_active)
+    return measurement.to_dict() if measurement is not None else {}
@@ -0,0 +1,140 @@
+"""User profiles sharing a Yunmai scale."""
+
+from __future__ import annotations
+
+from bisect import bisect_left, insort
+from dataclasses import dataclass, field
+from operator import attrgetter
+from typing import Any
+
+from homeassistant.const import CONF_NAME
+
+from .const import CONF_AGE, CONF_GENDER, CONF_HEIGHT, CONF_IS_ACTIVE, CONF_WEIGHT
+from .parse_data import ScaleStatus, YunmaiMeasurement
+from .yunmai_kernel import MetricsKernel, compile_profile
+
+
+@dataclass(slots=True)
+class UserProfile:
+    """Profile used to compute body composition for one person."""
+
+    name: str
+    gender: int = 1  # 1 for male, 0 for female
+    height: float = 170
+    age: int = 30
+    is_active: bool = False
+    weight: float | None = None  # most recent attributed weight in kg
+    # Compiled with the profile; profiles are rebuilt when their settings change
+    kernel: MetricsKernel = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        """Compile the metrics kernel of the profile."""
+        self.kernel = compile_profile(self.gender, self.height, self.is_active)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> UserProfile:
+        """Create a profile from stored configuration."""
+        return cls(
+            name=data[CONF_NAME],
+            gender=data.get(CONF_GENDER, 1),
+            height=data.get(CONF_HEIGHT, 170),
+            age=data.get(CONF_AGE, 30),
+            is_active=data.get(CONF_IS_ACTIVE, False),
+            weight=data.get(CONF_WEIGHT),
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the profile as stored configuration."""
+        return {
+            CONF_NAME: self.name,
+            CONF_GENDER: self.gender,
+            CONF_HEIGHT: self.height,
+            CONF_AGE: self.age,
+            CONF_IS_ACTIVE: self.is_active,
+            CONF_WEIGHT: self.weight,
+        }
+
+    def stable_measurement(
+        self,
+        weight: float,
+        resistance: int,
+        count: int,
+        body_fat: float | None = None,
+    ) -> YunmaiMeasurement:
+        """
+        Build the stable measurement of a reading attributed to this profile.
+
+        :param weight: Weight in kg
+        :param resistance: Raw resistance value
+        :param count: Weigh-in count reported by the scale
+        :param body_fat: Body fat reported by the scale, computed if None
+        :return: Stable scale measurement
+        """
+        return YunmaiMeasurement(
+            ScaleStatus.STABLE,
+            weight,
+            count,
+            **self.kernel(weight, resistance, self.age, body_fat),
+            profile=self.name,
+        )
+
+
+_weight = attrgetter("weight")
+
+
+class ProfileIndex:
+    """Find the profile whose recent weight band contains a reading.
+
+    Profiles are kept sorted by their most recent weight, so the closest
+    profile to a reading is found with a binary search.
+    """
+
+    def __init__(self, tolerance: float) -> None:
+        """Initialize the index.
+
+        :param tolerance: kg a reading may differ from a profile's weight
+        """
+        self.tolerance = tolerance
+        self._profiles: list[UserProfile] = []
+
+    def __len__(self) -> int:
+        """Return the number of indexed profiles."""
+        return len(self._profiles)
+
+    def add(self, profile: UserProfile) -> None:
+        """Index a profile; profiles without a known weight are skipped."""
+        if profile.weight is None:
+            return
+        insort(self._profiles, profile, key=_weight)
+
+    def remove(self, profile: UserProfile) -> None:
+        """Remove a profile from the index."""
+        if profile.weight is None:
+            return
+        profiles = self._profiles
+        i = bisect_left(profiles, profile.weight, key=_weight)
+        while i < len(profiles) and profiles[i].weight == profile.weight:
+            if profiles[i] is profile:
+                del profiles[i]
+                return
+            i += 1
+
+    def update(self, profile: UserProfile, weight: float) -> None:
+        """Move a profile to a new recent weight."""
+        self.remove(profile)
+        profile.weight = weight
+        self.add(profile)
+
+    def match(self, weight: float) -> UserProfile | None:
+        """Return the profile closest to a weight within the tolerance."""
+        profiles = self._profiles
+        i = bisect_left(profiles, weight, key=_weight)
+        best = None
+        best_distance = self.tolerance
+        for j in (i - 1, i):
+            if 0 <= j < len(profiles):
+                distance = abs(profiles[j].weight - weight)
+                if distance <= best_distance:
+                    best = profiles[j]
+                    best_distance = distance
+        return best
@@ -0,0 +1,119 @@
+"""Validation of scales provisioned in bulk from YAML or CSV."""
+
+from __future__ import annotations
+
+import csv
+import io
+from typing import Any
+
+import voluptuous as vol
+from bluetooth_data_tools import short_address
+from homeassistant.const import CONF_ADDRESS, CONF_NAME
+from homeassistant.helpers import config_validation as cv
+
+from .const import (
+    CONF_AGE,
+    CONF_GENDER,
+    CONF_HEIGHT,
+    CONF_IS_ACTIVE,
+    CONF_SCALES,
+    DOMAIN,
+    MAC_PATTERN,
+)
+
+# Column accepted in place of address in CSV files
+CSV_MAC_COLUMN = "mac"
+
+GENDERS = {"1": 1, "0": 0, "male": 1, "female": 0, "m": 1, "f": 0}
+
+
+def gender(value: Any) -> int:
+    """Validate a gender given as 1/0 or male/female."""
+    try:
+        return GENDERS[str(value).strip().lower()]
+    except KeyError:
+        raise vol.Invalid(f"invalid gender {value!r}") from None
+
+
+SCALE_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_ADDRESS): vol.All(
+            cv.string,
+            vol.Strip,
+            vol.Upper,
+            vol.Match(MAC_PATTERN, msg="invalid MAC address"),
+        ),
+        vol.Optional(CONF_NAME): cv.string,
+        vol.Optional(CONF_GENDER, default=1): gender,
+        vol.Optional(CONF_HEIGHT, default=170): vol.All(
+            vol.Coerce(int), vol.Range(min=100, max=220)
+        ),
+        vol.Optional(CONF_AGE, default=30): vol.All(
+            vol.Coerce(int), vol.Range(min=10, max=99)
+        ),
+        vol.Optional(CONF_IS_ACTIVE, default=False): cv.boolean,
+    }
+)
+
+CONFIG_SCHEMA = vol.Schema(
+    {
+        vol.Optional(DOMAIN): vol.Schema(
+            {vol.Optional(CONF_SCALES, default=[]): [SCALE_SCHEMA]}
+        )
+    },
+    extra=vol.ALLOW_EXTRA,
+)
+
+
+def scale_entry_data(scale: dict[str, Any]) -> dict[str, Any]:
+    """Return the config entry data of a validated scale."""
+    address = scale[CONF_ADDRESS]
+    return {
+        CONF_NAME: scale.get(CONF_NAME) or f"Yunmai Scale {short_address(address)}",
+        CONF_ADDRESS: address,
+        CONF_GENDER: scale[CONF_GENDER],
+        CONF_HEIGHT: scale[CONF_HEIGHT],
+        CONF_IS_ACTIVE: scale[CONF_IS_ACTIVE],
+        CONF_AGE: scale[CONF_AGE],
+    }
+
+
+def parse_scales_csv(text: str) -> list[dict[str, Any]]:
+    """
+    Parse and validate scales from CSV with a header row.
+
+    Columns are address (or mac), name, gender, height, age and is_active;
+    only the address is required.
+
+    :param text: CSV content
+    :return: Validated scales in file order, each address only once
+    :raises vol.Invalid: If a row is invalid, naming the line
+    """
+    reader = csv.DictReader(io.StringIO(text.strip()))
+    if reader.fieldnames is None:
+        raise vol.Invalid("no scales given")
+    columns = [column.strip().lower() for column in reader.fieldnames]
+    if CSV_MAC_COLUMN in columns and CONF_ADDRESS not in columns:
+        columns[columns.index(CSV_MAC_COLUMN)] = CONF_ADDRESS
+    reader.fieldnames = columns
+
+    scales: dict[str, dict[str, Any]] = {}
+    for row in reader:
+        values = {
+            key: value for key, value in row.items() if key and value not in (None, "")
+        }
+        if not values:
+            continue
+        try:
+            scale = SCALE_SCHEMA(values)
+        except vol.Invalid as err:
+            raise vol.Invalid(f"line {reader.line_num}: {err}") from err
+        if scale[CONF_ADDRESS] in scales:
+            raise vol.Invalid(
+                f"line {reader.line_num}: {scale[CONF_ADDRESS]} is listed twice"
+            )
+        scales[scale[CONF_ADDRESS]] = scale
+
+    if not scales:
+        raise vol.Invalid("no scales given")
+    return list(scales.values())
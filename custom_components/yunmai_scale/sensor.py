@@ -5,6 +5,7 @@ from __future__ import annotations
 import logging
 from collections.abc import Callable
 from dataclasses import dataclass
+from functools import cache
 
 from bluetooth_data_tools import short_address
 from homeassistant.components.sensor import (
@@ -14,36 +15,54 @@ from homeassistant.components.sensor import (
     SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import PERCENTAGE, UnitOfMass
-from homeassistant.core import HomeAssistant
+from homeassistant.const import PERCENTAGE, UnitOfMass, UnitOfTime
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.typing import StateType
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt as dt_util
 
 from .const import (
     DOMAIN,
     ICON_BMI,
     ICON_BONE,
+    ICON_COUNTER,
+    ICON_DELTA,
     ICON_FAT,
+    ICON_LATENCY,
     ICON_LEAN,
     ICON_MUSCLE,
+    ICON_PROFILE,
     ICON_SKELETAL,
     ICON_STATUS,
+    ICON_TREND,
     ICON_VISCERAL,
     ICON_WATER,
     ICON_WEIGHT,
     SENSOR_BMI,
     SENSOR_BODY_FAT,
     SENSOR_BONE_MASS,
+    SENSOR_CALLBACK_LATENCY,
+    SENSOR_FRAMES_RECEIVED,
+    SENSOR_FRAMES_REJECTED,
+    SENSOR_FRAMES_SUPPRESSED,
+    SENSOR_LAST_FRAME,
     SENSOR_LEAN_BODY_MASS,
     SENSOR_MUSCLE_MASS,
+    SENSOR_PROFILE,
     SENSOR_SKELETAL_MUSCLE,
     SENSOR_STATUS,
     SENSOR_VISCERAL_FAT,
     SENSOR_WATER,
     SENSOR_WEIGHT,
+    TREND_EMA,
+    TREND_ROLLING_MEAN,
+    TREND_WEEKLY_DELTA,
 )
+from .parse_data import ScaleStatus, YunmaiMeasurement
+from .stats import CoordinatorStats
+from .trends import ROLLING_WINDOW, TREND_METRICS, MetricTrend
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -52,93 +71,217 @@ _LOGGER = logging.getLogger(__name__)
 class YunmaiSensorEntityDescription(SensorEntityDescription):
     """Describes Yunmai sensor entity."""
 
-    value_fn: Callable[[dict], StateType] = None
+    data_key: str = None
+    value_fn: Callable[[YunmaiMeasurement], StateType] = None
 
 
-SENSORS: tuple[YunmaiSensorEntityDescription, ...] = (
-    YunmaiSensorEntityDescription(
-        key=SENSOR_WEIGHT,
-        name="Weight",
-        native_unit_of_measurement=UnitOfMass.KILOGRAMS,
-        device_class=SensorDeviceClass.WEIGHT,
-        state_class=SensorStateClass.MEASUREMENT,
-        icon=ICON_WEIGHT,
-        value_fn=lambda data: data.get("weight"),
-    ),
-    YunmaiSensorEntityDescription(
-        key=SENSOR_BMI,
-        name="BMI",
-        state_class=SensorStateClass.MEASUREMENT,
-        icon=ICON_BMI,
-        value_fn=lambda data: data.get("bmi"),
-    ),
-    YunmaiSensorEntityDescription(
-        key=SENSOR_BODY_FAT,
-        name="Body Fat",
-        native_unit_of_measurement=PERCENTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-        icon=ICON_FAT,
-        value_fn=lambda data: data.get("body_fat"),
-    ),
-    YunmaiSensorEntityDescription(
-        key=SENSOR_MUSCLE_MASS,
-        name="Muscle Mass",
-        native_unit_of_measurement=PERCENTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-        icon=ICON_MUSCLE,
-        value_fn=lambda data: data.get("muscle_mass"),
-    ),
-    YunmaiSensorEntityDescription(
-        key=SENSOR_WATER,
-        name="Water Percentage",
-        native_unit_of_measurement=PERCENTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-        icon=ICON_WATER,
-        value_fn=lambda data: data.get("water_percentage"),
-    ),
-    YunmaiSensorEntityDescription(
-        key=SENSOR_BONE_MASS,
-        name="Bone Mass",
-        native_unit_of_measurement=UnitOfMass.KILOGRAMS,
-        device_class=SensorDeviceClass.WEIGHT,
-        state_class=SensorStateClass.MEASUREMENT,
-        icon=ICON_BONE,
-        value_fn=lambda data: data.get("bone_mass"),
-    ),
-    YunmaiSensorEntityDescription(
-        key=SENSOR_SKELETAL_MUSCLE,
-        name="Skeletal Muscle",
-        native_unit_of_measurement=PERCENTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-        icon=ICON_SKELETAL,
-        value_fn=lambda data: data.get("skeletal_muscle"),
-    ),
-    YunmaiSensorEntityDescription(
-        key=SENSOR_LEAN_BODY_MASS,
-        name="Lean Body Mass",
-        native_unit_of_measurement=UnitOfMass.KILOGRAMS,
-        device_class=SensorDeviceClass.WEIGHT,
-        state_class=SensorStateClass.MEASUREMENT,
-        icon=ICON_LEAN,
-        value_fn=lambda data: data.get("lean_body_mass"),
-    ),
-    YunmaiSensorEntityDescription(
-        key=SENSOR_VISCERAL_FAT,
-        name="Visceral Fat",
-        state_class=SensorStateClass.MEASUREMENT,
-        icon=ICON_VISCERAL,
-        value_fn=lambda data: data.get("visceral_fat"),
-    ),
-    YunmaiSensorEntityDescription(
-        key=SENSOR_STATUS,
-        name="Scale Status",
-        icon=ICON_STATUS,
-        entity_category=EntityCategory.DIAGNOSTIC,
-        value_fn=lambda data: data.get("status", "idle"),
+@cache
+def sensor_descriptions() -> tuple[YunmaiSensorEntityDescription, ...]:
+    """Return the measurement sensor descriptions, built on first use."""
+    return (
+        YunmaiSensorEntityDescription(
+            key=SENSOR_WEIGHT,
+            name="Weight",
+            native_unit_of_measurement=UnitOfMass.KILOGRAMS,
+            device_class=SensorDeviceClass.WEIGHT,
+            state_class=SensorStateClass.MEASUREMENT,
+            icon=ICON_WEIGHT,
+            data_key="weight",
+            value_fn=lambda data: data.weight,
+        ),
+        YunmaiSensorEntityDescription(
+            key=SENSOR_BMI,
+            name="BMI",
+            state_class=SensorStateClass.MEASUREMENT,
+            icon=ICON_BMI,
+            data_key="bmi",
+            value_fn=lambda data: data.bmi,
+        ),
+        YunmaiSensorEntityDescription(
+            key=SENSOR_BODY_FAT,
+            name="Body Fat",
+            native_unit_of_measurement=PERCENTAGE,
+            state_class=SensorStateClass.MEASUREMENT,
+            icon=ICON_FAT,
+            data_key="body_fat",
+            value_fn=lambda data: data.body_fat,
+        ),
+        YunmaiSensorEntityDescription(
+            key=SENSOR_MUSCLE_MASS,
+            name="Muscle Mass",
+            native_unit_of_measurement=PERCENTAGE,
+            state_class=SensorStateClass.MEASUREMENT,
+            icon=ICON_MUSCLE,
+            data_key="muscle_mass",
+            value_fn=lambda data: data.muscle_mass,
+        ),
+        YunmaiSensorEntityDescription(
+            key=SENSOR_WATER,
+            name="Water Percentage",
+            native_unit_of_measurement=PERCENTAGE,
+            state_class=SensorStateClass.MEASUREMENT,
+            icon=ICON_WATER,
+            data_key="water_percentage",
+            value_fn=lambda data: data.water_percentage,
+        ),
+        YunmaiSensorEntityDescription(
+            key=SENSOR_BONE_MASS,
+            name="Bone Mass",
+            native_unit_of_measurement=UnitOfMass.KILOGRAMS,
+            device_class=SensorDeviceClass.WEIGHT,
+            state_class=SensorStateClass.MEASUREMENT,
+            icon=ICON_BONE,
+            data_key="bone_mass",
+            value_fn=lambda data: data.bone_mass,
+        ),
+        YunmaiSensorEntityDescription(
+            key=SENSOR_SKELETAL_MUSCLE,
+            name="Skeletal Muscle",
+            native_unit_of_measurement=PERCENTAGE,
+            state_class=SensorStateClass.MEASUREMENT,
+            icon=ICON_SKELETAL,
+            data_key="skeletal_muscle",
+            value_fn=lambda data: data.skeletal_muscle,
+        ),
+        YunmaiSensorEntityDescription(
+            key=SENSOR_LEAN_BODY_MASS,
+            name="Lean Body Mass",
+            native_unit_of_measurement=UnitOfMass.KILOGRAMS,
+            device_class=SensorDeviceClass.WEIGHT,
+            state_class=SensorStateClass.MEASUREMENT,
+            icon=ICON_LEAN,
+            data_key="lean_body_mass",
+            value_fn=lambda data: data.lean_body_mass,
+        ),
+        YunmaiSensorEntityDescription(
+            key=SENSOR_VISCERAL_FAT,
+            name="Visceral Fat",
+            state_class=SensorStateClass.MEASUREMENT,
+            icon=ICON_VISCERAL,
+            data_key="visceral_fat",
+            value_fn=lambda data: data.visceral_fat,
+        ),
+        YunmaiSensorEntityDescription(
+            key=SENSOR_PROFILE,
+            name="Profile",
+            icon=ICON_PROFILE,
+            data_key="profile",
+            value_fn=lambda data: data.profile,
+        ),
+        YunmaiSensorEntityDescription(
+            key=SENSOR_STATUS,
+            name="Scale Status",
+            icon=ICON_STATUS,
+            entity_category=EntityCategory.DIAGNOSTIC,
+            data_key="status",
+            value_fn=lambda data: data.status,
+        ),
+    )
+
+
+@dataclass
+class YunmaiTrendSensorEntityDescription(SensorEntityDescription):
+    """Describes Yunmai trend sensor entity."""
+
+    metric: str = None
+    value_fn: Callable[[MetricTrend], StateType] = None
+
+
+# Sensor key suffix, name suffix, icon and value of each kind of trend
+TREND_KINDS = (
+    (TREND_EMA, "Average", ICON_TREND, lambda trend: trend.ema),
+    (
+        TREND_ROLLING_MEAN,
+        f"{ROLLING_WINDOW} Weigh-in Mean",
+        ICON_TREND,
+        lambda trend: trend.rolling_mean,
     ),
+    (TREND_WEEKLY_DELTA, "Weekly Change", ICON_DELTA, lambda trend: trend.weekly_delta),
 )
 
 
+@cache
+def trend_sensor_descriptions() -> tuple[YunmaiTrendSensorEntityDescription, ...]:
+    """Return the trend sensor descriptions, derived from the metric sensors."""
+    return tuple(
+        YunmaiTrendSensorEntityDescription(
+            key=f"{description.key}_{suffix}",
+            name=f"{description.name} {name}",
+            native_unit_of_measurement=description.native_unit_of_measurement,
+            device_class=description.device_class,
+            state_class=SensorStateClass.MEASUREMENT,
+            suggested_display_precision=1,
+            icon=icon,
+            # Weight trends are enabled, the others can be enabled as needed
+            entity_registry_enabled_default=description.key == SENSOR_WEIGHT,
+            metric=description.data_key,
+            value_fn=value_fn,
+        )
+        for description in sensor_descriptions()
+        if description.data_key in TREND_METRICS
+        for suffix, name, icon, value_fn in TREND_KINDS
+    )
+
+
+@dataclass
+class YunmaiDiagnosticSensorEntityDescription(SensorEntityDescription):
+    """Describes Yunmai diagnostic sensor entity."""
+
+    value_fn: Callable[[CoordinatorStats], StateType] = None
+
+
+@cache
+def diagnostic_sensor_descriptions() -> tuple[
+    YunmaiDiagnosticSensorEntityDescription, ...
+]:
+    """Return the diagnostic sensor descriptions, built on first use."""
+    return (
+        YunmaiDiagnosticSensorEntityDescription(
+            key=SENSOR_FRAMES_RECEIVED,
+            name="Frames Received",
+            state_class=SensorStateClass.TOTAL_INCREASING,
+            icon=ICON_COUNTER,
+            value_fn=lambda stats: stats.adverts,
+        ),
+        YunmaiDiagnosticSensorEntityDescription(
+            key=SENSOR_FRAMES_REJECTED,
+            name="Frames Rejected",
+            state_class=SensorStateClass.TOTAL_INCREASING,
+            icon=ICON_COUNTER,
+            value_fn=lambda stats: stats.mac_rejected + stats.invalid,
+        ),
+        YunmaiDiagnosticSensorEntityDescription(
+            key=SENSOR_FRAMES_SUPPRESSED,
+            name="Frames Suppressed",
+            state_class=SensorStateClass.TOTAL_INCREASING,
+            icon=ICON_COUNTER,
+            value_fn=lambda stats: stats.suppressed,
+        ),
+        YunmaiDiagnosticSensorEntityDescription(
+            key=SENSOR_CALLBACK_LATENCY,
+            name="Callback Latency",
+            native_unit_of_measurement=UnitOfTime.MICROSECONDS,
+            device_class=SensorDeviceClass.DURATION,
+            state_class=SensorStateClass.MEASUREMENT,
+            suggested_display_precision=1,
+            icon=ICON_LATENCY,
+            value_fn=lambda stats: (
+                stats.latency.mean * 1e6 if stats.latency.mean is not None else None
+            ),
+        ),
+        YunmaiDiagnosticSensorEntityDescription(
+            key=SENSOR_LAST_FRAME,
+            name="Last Frame",
+            device_class=SensorDeviceClass.TIMESTAMP,
+            value_fn=lambda stats: (
+                dt_util.utc_from_timestamp(stats.last_frame_time)
+                if stats.last_frame_time is not None
+                else None
+            ),
+        ),
+    )
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
     entry: ConfigEntry,
@@ -147,7 +290,17 @@ async def async_setup_entry(
     """Set up Yunmai sensor based on a config entry."""
     coordinator = hass.data[DOMAIN][entry.entry_id]
 
-    entities = [YunmaiSensor(coordinator, description) for description in SENSORS]
+    entities: list[SensorEntity] = [
+        YunmaiSensor(coordinator, description) for description in sensor_descriptions()
+    ]
+    entities.extend(
+        YunmaiTrendSensor(coordinator, description)
+        for description in trend_sensor_descriptions()
+    )
+    entities.extend(
+        YunmaiDiagnosticSensor(coordinator, description)
+        for description in diagnostic_sensor_descriptions()
+    )
 
     async_add_entities(entities)
 
@@ -175,10 +328,16 @@ class YunmaiSensor(CoordinatorEntity, SensorEntity):
         #     (dr.CONNECTION_NETWORK_MAC, coordinator.mac_address)
         # )
 
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only when this sensor's value changed."""
+        if self.entity_description.data_key in self.coordinator.changed_keys:
+            self.async_write_ha_state()
+
     @property
     def native_value(self) -> StateType:
         """Return the state of the sensor."""
-        if not self.coordinator.data:
+        if self.coordinator.data is None:
             if self.entity_description.key == SENSOR_STATUS:
                 return self._previous_value or "idle"
             return self._previous_value
@@ -199,4 +358,67 @@ class YunmaiSensor(CoordinatorEntity, SensorEntity):
             return True
 
         # For other sensors, check if data is available
-        return super().available and self.coordinator.data
+        return super().available and self.coordinator.data is not None
+
+
+class YunmaiTrendSensor(CoordinatorEntity, SensorEntity):
+    """Yunmai Scale trend of a metric for the profile of the latest weigh-in."""
+
+    entity_description: YunmaiTrendSensorEntityDescription
+    _attr_has_entity_name = True
+
+    def __init__(
+        self, coordinator, description: YunmaiTrendSensorEntityDescription
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self.entity_description = description
+        self._attr_device_info = coordinator.device_info
+        self._attr_unique_id = (
+            f"{short_address(coordinator.mac_address)}_{description.key}"
+        )
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only when a finished weigh-in updated the trends."""
+        data = self.coordinator.data
+        if data is not None and data.status == ScaleStatus.STABLE:
+            self.async_write_ha_state()
+
+    @property
+    def native_value(self) -> StateType:
+        """Return the state of the sensor."""
+        trend = self.coordinator.trends.get(self.entity_description.metric)
+        if trend is None:
+            return None
+        return self.entity_description.value_fn(trend)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, str | None]:
+        """Return the profile the trend belongs to."""
+        return {"profile": self.coordinator.trends.profile}
+
+
+class YunmaiDiagnosticSensor(SensorEntity):
+    """Yunmai Scale hot-path counter, polled rather than pushed per frame."""
+
+    entity_description: YunmaiDiagnosticSensorEntityDescription
+    _attr_has_entity_name = True
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(
+        self, coordinator, description: YunmaiDiagnosticSensorEntityDescription
+    ) -> None:
+        """Initialize the sensor."""
+        self.coordinator = coordinator
+        self.entity_description = description
+        self._attr_device_info = coordinator.device_info
+        self._attr_unique_id = (
+            f"{short_address(coordinator.mac_address)}_{description.key}"
+        )
+
+    @property
+    def native_value(self) -> StateType:
+        """Return the state of the sensor."""
+        return self.entity_description.value_fn(self.coordinator.stats)
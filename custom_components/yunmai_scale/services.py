@@ -0,0 +1,226 @@
+"""Services of the Yunmai Scale integration."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import TYPE_CHECKING, Any
+
+import voluptuous as vol
+from homeassistant.const import CONF_NAME
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.util import dt as dt_util
+from homeassistant.util import slugify
+
+from .const import (
+    ATTR_CONFIG_ENTRY_ID,
+    ATTR_PROFILE,
+    ATTR_READINGS,
+    ATTR_RESISTANCE,
+    ATTR_TIMESTAMP,
+    ATTR_WEIGHT,
+    DEFAULT_PROFILE_NAME,
+    DOMAIN,
+    SERVICE_IMPORT_STATISTICS,
+)
+
+if TYPE_CHECKING:
+    from homeassistant.components.recorder.models import StatisticMetaData
+
+    from .coordinator import YunmaiDataCoordinator
+    from .profiles import UserProfile
+
+IMPORT_STATISTICS_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_PROFILE, default=DEFAULT_PROFILE_NAME): cv.string,
+        vol.Required(ATTR_READINGS): vol.All(
+            cv.ensure_list,
+            [
+                vol.Schema(
+                    {
+                        vol.Required(ATTR_TIMESTAMP): cv.datetime,
+                        vol.Required(ATTR_WEIGHT): vol.All(
+                            vol.Coerce(float), vol.Range(min=0, max=655.35)
+                        ),
+                        vol.Required(ATTR_RESISTANCE): vol.All(
+                            vol.Coerce(int), vol.Range(min=0, max=0xFFFF)
+                        ),
+                    }
+                )
+            ],
+        ),
+    }
+)
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the services of the integration."""
+
+    async def async_import_statistics(call: ServiceCall) -> ServiceResponse:
+        """Import historical readings into long-term statistics."""
+        return await _async_import_statistics(hass, call)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_IMPORT_STATISTICS,
+        async_import_statistics,
+        schema=IMPORT_STATISTICS_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+
+async def _async_import_statistics(
+    hass: HomeAssistant, call: ServiceCall
+) -> ServiceResponse:
+    """Compute the metrics of each reading and import them per metric in bulk."""
+    if "recorder" not in hass.config.components:
+        raise ServiceValidationError("The recorder is required to import statistics")
+
+    coordinator: YunmaiDataCoordinator | None = hass.data.get(DOMAIN, {}).get(
+        call.data[ATTR_CONFIG_ENTRY_ID]
+    )
+    if coordinator is None:
+        raise ServiceValidationError(
+            f"No loaded Yunmai scale with config entry {call.data[ATTR_CONFIG_ENTRY_ID]}"
+        )
+    if (profile := coordinator.profiles.get(call.data[ATTR_PROFILE])) is None:
+        raise ServiceValidationError(f"Unknown profile {call.data[ATTR_PROFILE]}")
+
+    from homeassistant.components.recorder.models import StatisticData
+    from homeassistant.components.recorder.statistics import (
+        async_add_external_statistics,
+    )
+
+    from .sensor import sensor_descriptions
+
+    hourly = await hass.async_add_executor_job(
+        hourly_metrics, call.data[ATTR_READINGS], profile
+    )
+
+    scale_name = coordinator.entry.data.get(CONF_NAME, "Yunmai Scale")
+    object_id = slugify(
+        f"{coordinator.mac_address or coordinator.entry.entry_id} {profile.name}"
+    )
+    imported: dict[str, int] = {}
+    for description in sensor_descriptions():
+        if (hours := hourly.get(description.data_key)) is None:
+            continue
+        statistic_id = f"{DOMAIN}:{object_id}_{description.data_key}"
+        async_add_external_statistics(
+            hass,
+            statistic_metadata(
+                f"{scale_name} {profile.name} {description.name}",
+                statistic_id,
+                description.native_unit_of_measurement,
+            ),
+            [
+                StatisticData(start=start, mean=mean, min=low, max=high)
+                for start, (mean, low, high) in sorted(hours.items())
+            ],
+        )
+        imported[statistic_id] = len(hours)
+
+    return {"readings": len(call.data[ATTR_READINGS]), "statistics": imported}
+
+
+def statistic_metadata(
+    name: str, statistic_id: str, unit: str | None
+) -> StatisticMetaData:
+    """
+    Build the metadata of an imported statistic with an hourly mean.
+
+    Home Assistant 2025.4 replaced has_mean with mean_type, and 2025.10 added
+    the unit class, so both are set when the running version supports them.
+
+    :param name: Name shown for the statistic
+    :param statistic_id: Id of the external statistic
+    :param unit: Unit of the values, None if they have none
+    :return: Metadata for async_add_external_statistics
+    """
+    from homeassistant.components.recorder.models import StatisticMetaData
+    from homeassistant.components.recorder.statistics import (
+        STATISTIC_UNIT_TO_UNIT_CONVERTER,
+    )
+
+    metadata = StatisticMetaData(
+        has_sum=False,
+        name=name,
+        source=DOMAIN,
+        statistic_id=statistic_id,
+        unit_of_measurement=unit,
+    )
+    try:
+        from homeassistant.components.recorder.models import StatisticMeanType
+    except ImportError:
+        # Before Home Assistant 2025.4
+        metadata["has_mean"] = True
+        return metadata
+
+    metadata["mean_type"] = StatisticMeanType.ARITHMETIC
+    converter = STATISTIC_UNIT_TO_UNIT_CONVERTER.get(unit)
+    metadata["unit_class"] = converter.UNIT_CLASS if converter else None
+    return metadata
+
+
+def hourly_metrics(
+    readings: list[dict[str, Any]], profile: UserProfile
+) -> dict[str, dict[datetime, tuple[float, float, float]]]:
+    """
+    Compute the metrics of readings and aggregate them per hour.
+
+    Long-term statistics are stored per hour, so several readings within an
+    hour are reduced to their mean, minimum and maximum. Metrics of all
+    readings are computed at once with yunmai_batch, which matches YmLib
+    bit for bit, and rounded like the sensors round them. Does blocking
+    work, including the first import of numpy.
+
+    :param readings: Readings with a timestamp, weight in kg and raw resistance
+    :param profile: Profile the readings belong to
+    :return: (mean, min, max) per metric and start of the hour in UTC
+    """
+    if not readings:
+        return {}
+
+    import numpy as np
+
+    from .yunmai_batch import compute_metrics
+
+    timestamps = np.array(
+        [dt_util.as_utc(reading[ATTR_TIMESTAMP]).timestamp() for reading in readings]
+    )
+    hours, bucket = np.unique(timestamps - timestamps % 3600, return_inverse=True)
+    counts = np.bincount(bucket)
+    metrics = compute_metrics(
+        [reading[ATTR_WEIGHT] for reading in readings],
+        [reading[ATTR_RESISTANCE] for reading in readings],
+        profile.age,
+        profile.gender,
+        profile.height,
+        profile.is_active,
+    )
+    starts = [dt_util.utc_from_timestamp(hour) for hour in hours.tolist()]
+
+    hourly = {}
+    for metric, values in metrics.items():
+        if metric != "weight":
+            values = np.round(values, 0 if metric == "visceral_fat" else 1)
+        means = np.bincount(bucket, weights=values) / counts
+        lows = np.full(len(hours), np.inf)
+        np.minimum.at(lows, bucket, values)
+        highs = np.full(len(hours), -np.inf)
+        np.maximum.at(highs, bucket, values)
+        hourly[metric] = dict(
+            zip(
+                starts,
+                zip(means.tolist(), lows.tolist(), highs.tolist(), strict=True),
+                strict=True,
+            )
+        )
+    return hourly
@@ -0,0 +1,99 @@
+"""Track weigh-in sessions of a Yunmai scale."""
+
+from __future__ import annotations
+
+from collections import deque
+from statistics import median_low
+from typing import NamedTuple
+
+from .parse_data import YunmaiFrame
+
+# Finished weigh-ins whose late rebroadcasts are still recognized; the count
+# wraps at 256, so only the most recent ones are remembered
+FINISHED_COUNTS = 8
+
+
+class WeighInReading(NamedTuple):
+    """Aggregated stable reading of a finished weigh-in."""
+
+    count: int
+    weight: float
+    resistance: int
+    frames: int
+    body_fat: float | None = None  # reported by the scale
+
+
+class WeighInTracker:
+    """Aggregate the stable frames of each weigh-in into a single reading.
+
+    A weigh-in is identified by the frame count. Stable frames of the
+    current weigh-in are collected until it is finished, after which
+    rebroadcasts with the same count are ignored. Late rebroadcasts of
+    recently finished weigh-ins, e.g. relayed by a slow proxy, neither
+    finish the current weigh-in nor start another one.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the tracker."""
+        self.count: int | None = None
+        self.last_frame_time = 0.0
+        self._weights: list[float] = []
+        self._resistances: list[int] = []
+        self._body_fats: list[float] = []
+        self._finished_counts: deque[int] = deque(maxlen=FINISHED_COUNTS)
+
+    @property
+    def active(self) -> bool:
+        """Return True while stable frames of a weigh-in are being collected."""
+        return self.count is not None
+
+    @property
+    def frames(self) -> int:
+        """Return the number of stable frames of the current weigh-in."""
+        return len(self._weights)
+
+    def is_stale(self, count: int) -> bool:
+        """Return True for the count of a recently finished weigh-in."""
+        return count != self.count and count in self._finished_counts
+
+    def add_stable(self, frame: YunmaiFrame, now: float) -> WeighInReading | None:
+        """
+        Add a stable frame to its weigh-in.
+
+        :param frame: Decoded stable frame
+        :param now: Monotonic time the frame was received
+        :return: Reading of the previous weigh-in if this frame started a new one
+        """
+        if self.is_stale(frame.count):
+            return None
+
+        finished = None
+        if self.count is not None and frame.count != self.count:
+            finished = self.finish()
+
+        self.count = frame.count
+        self.last_frame_time = now
+        self._weights.append(frame.weight)
+        self._resistances.append(frame.resistance)
+        if frame.body_fat is not None:
+            self._body_fats.append(frame.body_fat)
+        return finished
+
+    def finish(self) -> WeighInReading | None:
+        """Finish the current weigh-in and return its median reading."""
+        if self.count is None:
+            return None
+
+        reading = WeighInReading(
+            self.count,
+            median_low(self._weights),
+            median_low(self._resistances),
+            len(self._weights),
+            median_low(self._body_fats) if self._body_fats else None,
+        )
+        self._finished_counts.append(self.count)
+        self.count = None
+        self._weights.clear()
+        self._resistances.clear()
+        self._body_fats.clear()
+        return reading
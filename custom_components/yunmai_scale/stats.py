@@ -0,0 +1,119 @@
+"""Low-overhead counters for the Yunmai Scale hot paths."""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from typing import Any
+
+# Upper bounds of the callback latency histogram buckets in microseconds
+LATENCY_BUCKETS_US = (10, 25, 50, 100, 250, 500, 1000, 5000)
+
+
+class LatencyHistogram:
+    """Fixed-bucket histogram of callback latencies."""
+
+    __slots__ = ("counts", "max", "total")
+
+    def __init__(self) -> None:
+        """Initialize the histogram."""
+        self.counts = [0] * (len(LATENCY_BUCKETS_US) + 1)
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        """Record a latency."""
+        self.counts[bisect_left(LATENCY_BUCKETS_US, seconds * 1e6)] += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    @property
+    def mean(self) -> float | None:
+        """Return the mean latency in seconds."""
+        if not (samples := sum(self.counts)):
+            return None
+        return self.total / samples
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the histogram for diagnostics."""
+        buckets = {
+            f"<={bound}us": count
+            for bound, count in zip(LATENCY_BUCKETS_US, self.counts, strict=False)
+        }
+        buckets[f">{LATENCY_BUCKETS_US[-1]}us"] = self.counts[-1]
+        mean = self.mean
+        return {
+            "buckets": buckets,
+            "mean_us": round(mean * 1e6, 1) if mean is not None else None,
+            "max_us": round(self.max * 1e6, 1),
+        }
+
+
+class CoordinatorStats:
+    """Counters of the frames a coordinator has seen and what happened to them."""
+
+    __slots__ = (
+        "adverts",
+        "idle",
+        "invalid",
+        "last_frame_time",
+        "latency",
+        "mac_rejected",
+        "measuring",
+        "parsed",
+        "stable",
+        "suppressed",
+        "sync_failures",
+        "synced",
+    )
+
+    def __init__(self) -> None:
+        """Initialize the counters."""
+        self.adverts = 0  # advertisements handed to the coordinator
+        self.mac_rejected = 0  # advertisements of this scale without its MAC
+        self.suppressed = 0  # identical rebroadcasts dropped before parsing
+        self.invalid = 0  # frames dropped by the length guard
+        self.parsed = 0
+        self.idle = 0
+        self.measuring = 0
+        self.stable = 0
+        self.synced = 0  # stored readings downloaded from the scale
+        self.sync_failures = 0
+        self.last_frame_time: float | None = None  # seconds since the epoch
+        self.latency = LatencyHistogram()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the counters for diagnostics."""
+        return {
+            "adverts": self.adverts,
+            "mac_rejected": self.mac_rejected,
+            "suppressed": self.suppressed,
+            "invalid": self.invalid,
+            "parsed": self.parsed,
+            "idle": self.idle,
+            "measuring": self.measuring,
+            "stable": self.stable,
+            "synced": self.synced,
+            "sync_failures": self.sync_failures,
+            "last_frame_time": self.last_frame_time,
+            "latency": self.latency.as_dict(),
+        }
+
+
+class DispatcherStats:
+    """Counters of the advertisements seen by the shared dispatcher."""
+
+    __slots__ = ("adverts", "routed", "unrouted")
+
+    def __init__(self) -> None:
+        """Initialize the counters."""
+        self.adverts = 0
+        self.routed = 0
+        self.unrouted = 0  # advertisements of scales that are not configured
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the counters for diagnostics."""
+        return {
+            "adverts": self.adverts,
+            "routed": self.routed,
+            "unrouted": self.unrouted,
+        }
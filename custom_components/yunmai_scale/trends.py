@@ -0,0 +1,151 @@
+"""Incremental trend statistics of Yunmai scale measurements."""
+
+from __future__ import annotations
+
+from .parse_data import YunmaiMeasurement
+
+# Measurement fields trends are kept for
+TREND_METRICS = (
+    "weight",
+    "bmi",
+    "body_fat",
+    "muscle_mass",
+    "water_percentage",
+    "bone_mass",
+    "skeletal_muscle",
+    "lean_body_mass",
+    "visceral_fat",
+)
+
+# Weigh-ins the exponential moving average is smoothed over
+EMA_SPAN = 7
+EMA_ALPHA = 2 / (EMA_SPAN + 1)
+# Weigh-ins the rolling mean is taken over
+ROLLING_WINDOW = 7
+# Days the delta is taken over
+DELTA_DAYS = 7
+
+SECONDS_PER_DAY = 86400
+
+
+class MetricTrend:
+    """Trend statistics of one metric, updated in constant time and memory.
+
+    The rolling mean keeps the last ROLLING_WINDOW values in a ring with a
+    running sum. The delta keeps the first value of each of the last
+    DELTA_DAYS + 1 days, so the value of a week ago is found without
+    looking at older readings.
+    """
+
+    __slots__ = (
+        "_day_values",
+        "_days",
+        "_window",
+        "_window_count",
+        "_window_index",
+        "_window_sum",
+        "day",
+        "ema",
+        "latest",
+    )
+
+    def __init__(self) -> None:
+        """Initialize an empty trend."""
+        self.latest: float | None = None
+        self.day: int | None = None  # day number of the latest value
+        self.ema: float | None = None
+        self._window = [0.0] * ROLLING_WINDOW
+        self._window_sum = 0.0
+        self._window_index = 0
+        self._window_count = 0
+        self._days: list[int | None] = [None] * (DELTA_DAYS + 1)
+        self._day_values = [0.0] * (DELTA_DAYS + 1)
+
+    def update(self, value: float, timestamp: float) -> None:
+        """
+        Add the value of a weigh-in.
+
+        :param value: Metric value
+        :param timestamp: Time of the weigh-in in seconds since the epoch
+        """
+        self.latest = value
+        self.ema = (
+            value if self.ema is None else self.ema + EMA_ALPHA * (value - self.ema)
+        )
+
+        index = self._window_index
+        self._window_sum += value - self._window[index]
+        self._window[index] = value
+        self._window_index = (index + 1) % ROLLING_WINDOW
+        self._window_count = min(self._window_count + 1, ROLLING_WINDOW)
+
+        day = int(timestamp // SECONDS_PER_DAY)
+        slot = day % len(self._days)
+        if self._days[slot] != day:
+            self._days[slot] = day
+            self._day_values[slot] = value
+        self.day = day
+
+    @property
+    def rolling_mean(self) -> float | None:
+        """Return the mean of the last ROLLING_WINDOW values."""
+        if not self._window_count:
+            return None
+        return self._window_sum / self._window_count
+
+    @property
+    def weekly_delta(self) -> float | None:
+        """Return the change since the first value of the oldest day in the last week."""
+        if self.day is None:
+            return None
+        # Slots of days outside the week hold stale values and are skipped
+        for day in range(self.day - DELTA_DAYS, self.day):
+            slot = day % len(self._days)
+            if self._days[slot] == day:
+                return self.latest - self._day_values[slot]
+        return None
+
+
+class TrendTracker:
+    """Trends of every metric, kept per profile."""
+
+    def __init__(self) -> None:
+        """Initialize the tracker."""
+        self.profile: str | None = None  # profile of the latest weigh-in
+        self._trends: dict[str | None, dict[str, MetricTrend]] = {}
+
+    def update(self, measurement: YunmaiMeasurement, timestamp: float) -> None:
+        """
+        Add a stable measurement to the trends of its profile.
+
+        :param measurement: Stable measurement of a finished weigh-in
+        :param timestamp: Time of the weigh-in in seconds since the epoch
+        """
+        trends = self._trends.get(measurement.profile)
+        if trends is None:
+            trends = self._trends[measurement.profile] = {
+                metric: MetricTrend() for metric in TREND_METRICS
+            }
+        for metric, trend in trends.items():
+            if (value := getattr(measurement, metric)) is not None:
+                trend.update(value, timestamp)
+        self.profile = measurement.profile
+
+    def get(self, metric: str, profile: str | None = None) -> MetricTrend | None:
+        """Return the trend of a metric, by default for the latest profile."""
+        trends = self._trends.get(profile if profile is not None else self.profile)
+        return trends[metric] if trends is not None else None
+
+    def as_dict(self) -> dict[str | None, dict[str, dict[str, float | None]]]:
+        """Return the trends of every profile for diagnostics."""
+        return {
+            profile: {
+                metric: {
+                    "ema": trend.ema,
+                    "rolling_mean": trend.rolling_mean,
+                    "weekly_delta": trend.weekly_delta,
+                }
+                for metric, trend in trends.items()
+            }
+            for profile, trends in self._trends.items()
+        }
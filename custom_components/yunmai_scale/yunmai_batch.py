@@ -0,0 +1,114 @@
+"""
+Vectorized body composition calculations for many measurements at once.
+
+Array counterpart of YmLib: every formula is evaluated element-wise in the
+same order as the scalar methods, so results match YmLib bit for bit.
+Requires numpy, which is only imported when this module is used.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+
+def compute_metrics(
+    weight: ArrayLike,
+    resistance: ArrayLike,
+    age: ArrayLike,
+    sex: ArrayLike,
+    height: ArrayLike,
+    active: ArrayLike,
+) -> dict[str, np.ndarray]:
+    """
+    Compute all body composition metrics for arrays of measurements.
+
+    Inputs are broadcast against each other, so profile values may be
+    scalars when every measurement belongs to the same user. Values are
+    not rounded; round them like process_data does if needed.
+
+    :param weight: kg
+    :param resistance: raw resistance from the scale
+    :param age: years
+    :param sex: male = 1; female = 0
+    :param height: cm
+    :param active: active lifestyle flags
+    :return: Dictionary of metric name to array, keyed like process_data
+    """
+    weight, resistance, age, sex, height, active = np.broadcast_arrays(
+        np.asarray(weight, dtype=np.float64),
+        np.asarray(resistance, dtype=np.float64),
+        np.asarray(age, dtype=np.float64),
+        np.asarray(sex),
+        np.asarray(height, dtype=np.float64),
+        np.asarray(active, dtype=bool),
+    )
+    male = sex == 1
+
+    # YmLib.get_bmi
+    bmi = weight / ((height / 100.0) ** 2)
+
+    # YmLib.get_fat (< 0x1e version devices)
+    r = (resistance - 100.0) / 100.0
+    r = np.where(r >= 1, np.sqrt(np.where(r >= 1, r, 1.0)), r)
+    h = height / 100.0
+    fat = (weight * 1.5 / h / h) + (age * 0.08)
+    fat = np.where(male, fat - 10.8, fat)
+    fat = (fat - 7.4) + r
+    fat = np.where((fat < 5.0) | (fat > 75.0), 0.0, fat)
+
+    lean = 100.0 - fat
+
+    # YmLib.get_muscle
+    muscle = np.where(active, lean * 0.7, lean * 0.67)
+    muscle = ((muscle * 100.0) + 0.5) / 100.0
+
+    # YmLib.get_water
+    water = (lean * 0.726 * 100.0 + 0.5) / 100.0
+
+    # YmLib.get_bone_mass
+    bone_base = (weight * (muscle / 100.0) * 4.0) / 7.0
+    bone_mass = np.where(sex != 0, bone_base * 0.22 * 0.6, bone_base * 0.34 * 0.45) + (
+        (height - 170.0) / 100.0
+    )
+    bone_mass = ((bone_mass * 10.0) + 0.5) / 10.0
+
+    # YmLib.get_skeletal_muscle
+    skeletal_muscle = np.where(active, lean * 0.6, lean * 0.53)
+    skeletal_muscle = ((skeletal_muscle * 100.0) + 0.5) / 100.0
+
+    # YmLib.get_lean_body_mass
+    lean_body_mass = weight * lean / 100.0
+
+    # YmLib.get_visceral_fat
+    a = np.minimum(np.maximum(age, 18), 120)
+    fat_adjustment = np.where(
+        sex != 0,
+        np.where(a < 40, 21.0, np.where(a < 60, 22.0, 24.0)),
+        np.where(a < 40, 34.0, np.where(a < 60, 35.0, 36.0)),
+    )
+    f = fat - fat_adjustment
+    visceral_fat = np.where(
+        active,
+        np.where(
+            fat > 15.0,
+            (fat - 15.0) / 1.1 + 12.0,
+            -1 * (15.0 - fat) / 1.4 + 12.0,
+        ),
+        (f / np.where(f > 0.0, 1.1, 1.0)) + 9.5,
+    )
+    visceral_fat = np.maximum(
+        1.0, np.minimum(np.where(active, 9.0, 30.0), visceral_fat)
+    )
+
+    return {
+        "weight": weight,
+        "bmi": bmi,
+        "body_fat": fat,
+        "muscle_mass": muscle,
+        "water_percentage": water,
+        "bone_mass": bone_mass,
+        "skeletal_muscle": skeletal_muscle,
+        "lean_body_mass": lean_body_mass,
+        "visceral_fat": visceral_fat,
+    }
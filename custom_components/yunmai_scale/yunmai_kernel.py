@@ -0,0 +1,139 @@
+"""
+Body composition formulas of YmLib, precompiled per user profile.
+
+Every YmLib method branches on the profile and recomputes values that only
+depend on it. compile_profile() folds those into a flat set of coefficients
+once and binds them into a kernel, so computing all metrics of a reading is
+a straight-line function of weight, resistance and age. Operations are kept
+in the same order as in YmLib, so results match it bit for bit.
+"""
+
+from __future__ import annotations
+
+import math
+from collections.abc import Callable
+from functools import lru_cache
+from typing import NamedTuple
+
+# (weight, resistance, age, reported body fat) -> rounded metrics, like
+# compute_metrics
+MetricsKernel = Callable[[float, int, int, float | None], dict]
+
+
+class ProfileCoefficients(NamedTuple):
+    """Profile-only constants of the YmLib formulas."""
+
+    bmi_divisor: float  # (height / 100) ** 2
+    height_m: float  # height / 100
+    fat_sex_offset: float  # subtracted from male body fat, 0 for female
+    muscle_factor: float
+    skeletal_factor: float
+    bone_factor_a: float
+    bone_factor_b: float
+    bone_height_offset: float  # (height - 170) / 100
+    # Visceral fat adjustment for ages < 40, < 60 and above; unused when active
+    visceral_bands: tuple[float, float, float]
+    visceral_max: float
+    active: bool
+
+
+def profile_coefficients(sex: int, height: float, active: bool) -> ProfileCoefficients:
+    """
+    Fold the profile-dependent constants and branches of YmLib.
+
+    :param sex: male = 1; female = 0
+    :param height: cm
+    :param active: Whether the user has an active lifestyle
+    :return: Coefficients of the profile
+    """
+    return ProfileCoefficients(
+        bmi_divisor=(height / 100.0) ** 2,
+        height_m=height / 100.0,
+        fat_sex_offset=10.8 if sex == 1 else 0.0,
+        muscle_factor=0.7 if active else 0.67,
+        skeletal_factor=0.6 if active else 0.53,
+        # YmLib.get_bone_mass tests sex for truthiness, unlike get_fat
+        bone_factor_a=0.22 if sex else 0.34,
+        bone_factor_b=0.6 if sex else 0.45,
+        bone_height_offset=(height - 170.0) / 100.0,
+        visceral_bands=(21.0, 22.0, 24.0) if sex else (34.0, 35.0, 36.0),
+        visceral_max=9.0 if active else 30.0,
+        active=bool(active),
+    )
+
+
+@lru_cache(maxsize=32)
+def compile_profile(sex: int, height: float, active: bool) -> MetricsKernel:
+    """
+    Compile the kernel computing all metrics of a reading for a profile.
+
+    Each UserProfile compiles its kernel once and keeps it, so coordinators
+    never depend on the cache; it spares compute_metrics(), which is used by
+    process_data(), recompiling the same few profiles.
+
+    :param sex: male = 1; female = 0
+    :param height: cm
+    :param active: Whether the user has an active lifestyle
+    :return: Function of weight, resistance, age and reported body fat
+    """
+    (
+        bmi_divisor,
+        h,
+        fat_sex_offset,
+        muscle_factor,
+        skeletal_factor,
+        bone_factor_a,
+        bone_factor_b,
+        bone_height_offset,
+        (band_40, band_60, band_max),
+        visceral_max,
+        active,
+    ) = profile_coefficients(sex, height, active)
+    sqrt = math.sqrt
+
+    def kernel(
+        weight: float, resistance: int, age: int, body_fat: float | None = None
+    ) -> dict:
+        if body_fat is not None:
+            # Measured by the scale itself on newer firmware
+            fat = body_fat
+        else:
+            # YmLib.get_fat, for < 0x1e version devices
+            r = (resistance - 100.0) / 100.0
+            if r >= 1:
+                r = sqrt(r)
+            fat = ((((weight * 1.5 / h / h) + (age * 0.08)) - fat_sex_offset) - 7.4) + r
+            if fat < 5.0 or fat > 75.0:
+                fat = 0.0
+
+        lean = 100.0 - fat
+        muscle = ((lean * muscle_factor * 100.0) + 0.5) / 100.0
+        bone_mass = (
+            (weight * (muscle / 100.0) * 4.0) / 7.0 * bone_factor_a * bone_factor_b
+        ) + bone_height_offset
+
+        # YmLib.get_visceral_fat
+        if active:
+            if fat > 15.0:
+                visceral_fat = (fat - 15.0) / 1.1 + 12.0
+            else:
+                visceral_fat = -1 * (15.0 - fat) / 1.4 + 12.0
+        else:
+            a = min(max(age, 18), 120)
+            f = fat - (band_40 if a < 40 else band_60 if a < 60 else band_max)
+            visceral_fat = (f / (1.1 if f > 0.0 else 1.0)) + 9.5
+
+        return {
+            "bmi": round(weight / bmi_divisor, 1),
+            "body_fat": round(fat, 1),
+            "muscle_mass": round(muscle, 1),
+            "water_percentage": round((lean * 0.726 * 100.0 + 0.5) / 100.0, 1),
+            "bone_mass": round(((bone_mass * 10.0) + 0.5) / 10.0, 1),
+            "skeletal_muscle": round(
+                ((lean * skeletal_factor * 100.0) + 0.5) / 100.0, 1
+            ),
+            "lean_body_mass": round(weight * lean / 100.0, 1),
+            "visceral_fat": round(max(1.0, min(visceral_max, visceral_fat))),
+        }
+
+    return kernel
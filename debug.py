@@ -1,84 +1,352 @@
 #!/usr/bin/env python3
+"""Scan, capture and replay Yunmai scale advertisements."""
+
+import argparse
 import asyncio
+import json
+import logging
 import signal
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
 
 from bleak import BleakScanner
+from bleak.exc import BleakError
+
+from capture import CaptureWriter, read_capture
+from custom_components.yunmai_scale.const import SERVICE_UUID
+from custom_components.yunmai_scale.parse_data import frame_to_mac, process_frame
 
-from custom_components.yunmai_scale.const import SERVICE_UUID_PREFIX
-from custom_components.yunmai_scale.parse_data import process_data
+_LOGGER = logging.getLogger(__name__)
 
-sex = 1  # 1=Male, 2=Female
+sex = 1  # 1=Male, 0=Female
 height = 170
 veryActive = True
 age = 25
+DEFAULT_PROFILE = {"sex": sex, "height": height, "age": age, "is_active": veryActive}
+
 
+def is_yunmai(advertisement_data):
+    """Check if the advertisement comes from a Yunmai scale."""
+    return any(
+        str(service_uuid).startswith(SERVICE_UUID[:8])
+        for service_uuid in advertisement_data.service_uuids
+    )
 
-# Global variables for stopping the scan
-scanner = None
-should_continue = True
 
+class Pipeline:
+    """Bounded queues between the scanner callback, parser and writer."""
 
-def handle_sigint(signal, frame):
-    """Handle Ctrl+C interrupt signal"""
-    global should_continue
-    print("\nStopping scan...")
-    should_continue = False
+    def __init__(self, profiles, output_dir, queue_size):
+        """Initialize the queues and backpressure metrics."""
+        self.profiles = profiles
+        self.output_dir = output_dir
+        self.frames = asyncio.Queue(maxsize=queue_size)
+        self.records = asyncio.Queue(maxsize=queue_size)
+        self.last_payload = {}
+        self.files = {}
+        # Backpressure metrics
+        self.enqueued = 0
+        self.dropped = 0
+        self.duplicates = 0
+        self.written = 0
+        self.high_water = 0
 
+    def detection_callback(self, device, advertisement_data):
+        """Enqueue each Yunmai broadcast without doing any work in the callback."""
+        if not is_yunmai(advertisement_data):
+            return
 
-async def detection_callback(device, advertisement_data):
-    """Callback function called each time a device broadcast is detected"""
-    for mfr_id, mfr_data in advertisement_data.manufacturer_data.items():
-        # print(
-        #     f"Detected device: {device.name}, Service UUID: {advertisement_data.service_uuids}"
-        # )
+        now = time.time()
+        for mfr_id, mfr_data in advertisement_data.manufacturer_data.items():
+            try:
+                self.frames.put_nowait((now, mfr_id, mfr_data, advertisement_data.rssi))
+            except asyncio.QueueFull:
+                self.dropped += 1
+                continue
+            self.enqueued += 1
+            self.high_water = max(self.high_water, self.frames.qsize())
 
-        # Check if this is the target device
-        matching_services = {
-            service_uuid
-            for service_uuid in advertisement_data.service_uuids
-            if str(service_uuid).startswith(SERVICE_UUID_PREFIX)
-        }
+    async def parse_worker(self):
+        """Deduplicate and parse frames with the profile of their scale."""
+        while True:
+            timestamp, mfr_id, mfr_data, rssi = await self.frames.get()
+            mac = frame_to_mac(mfr_id, mfr_data)
+            if self.last_payload.get(mac) == mfr_data:
+                self.duplicates += 1
+                continue
+            self.last_payload[mac] = mfr_data
 
-        if matching_services:
-            # Calculate device MAC
-            manufacturer_data_hex = mfr_id.to_bytes(2, "little").hex() + mfr_data.hex()
-            device_mac = ':'.join(
-                manufacturer_data_hex[:12].upper()[i : i + 2] for i in range(10, -2, -2)
+            profile = self.profiles.get(mac, DEFAULT_PROFILE)
+            measurement = process_frame(
+                mfr_data,
+                profile["age"],
+                profile["sex"],
+                profile["height"],
+                profile["is_active"],
             )
-            print(f"Detected device MAC: {device_mac}")
-            print("Broadcast data: ", mfr_data.hex())
+            if measurement is None:
+                continue
+            record = {
+                "timestamp": timestamp,
+                "mac": mac,
+                "rssi": rssi,
+                "raw": mfr_data.hex(),
+                **measurement.to_dict(),
+            }
+            await self.records.put((mac, record))
 
-            # Process the received data
-            print(process_data(mfr_data.hex()))
-            print("-" * 40)
+    async def writer(self):
+        """Write one JSON line per parsed frame, to a file per scale or stdout."""
+        while True:
+            mac, record = await self.records.get()
+            line = json.dumps(record) + "\n"
+            if self.output_dir is None:
+                sys.stdout.write(line)
+            else:
+                if mac not in self.files:
+                    path = self.output_dir / f"{mac.replace(':', '')}.jsonl"
+                    self.files[mac] = path.open("a")
+                self.files[mac].write(line)
+            self.written += 1
 
+    async def report(self, interval=10):
+        """Log backpressure metrics."""
+        while True:
+            await asyncio.sleep(interval)
+            _LOGGER.info(
+                "enqueued=%s dropped=%s duplicates=%s written=%s queued=%s/%s "
+                "high_water=%s",
+                self.enqueued,
+                self.dropped,
+                self.duplicates,
+                self.written,
+                self.frames.qsize(),
+                self.records.qsize(),
+                self.high_water,
+            )
 
-async def main():
-    global scanner, should_continue
+    def close(self):
+        """Close the per-scale output files."""
+        for file in self.files.values():
+            file.close()
 
-    try:
-        # Register signal handler
-        signal.signal(signal.SIGINT, handle_sigint)
 
-        print("Starting continuous scan for Yunmai scale...")
-        scanner = BleakScanner(detection_callback=detection_callback)
+def load_profiles(path):
+    """Load per-MAC profiles from a JSON file.
+
+    The file maps addresses to profiles, such as
+    {"AA:BB:...": {"sex": 1, "height": 170, "age": 25, "is_active": false}}.
+    """
+    if path is None:
+        return {}
+    return {
+        mac.upper(): {**DEFAULT_PROFILE, **profile}
+        for mac, profile in json.loads(path.read_text()).items()
+    }
+
+
+def capture_callback(writer):
+    """Return a scanner callback recording each Yunmai broadcast to a capture."""
+
+    def callback(device, advertisement_data):
+        if not is_yunmai(advertisement_data):
+            return
+
+        now = time.time()
+        for mfr_id, mfr_data in advertisement_data.manufacturer_data.items():
+            writer.write(now, device.address, advertisement_data.rssi, mfr_id, mfr_data)
+        _LOGGER.debug("Captured %s frames", writer.frames)
 
-        # Start scanning
+    return callback
+
+
+async def scan(callback):
+    """Scan with a detection callback until interrupted with Ctrl+C."""
+    stop = asyncio.Event()
+    asyncio.get_running_loop().add_signal_handler(signal.SIGINT, stop.set)
+
+    _LOGGER.info("Starting continuous scan for Yunmai scale...")
+    scanner = BleakScanner(detection_callback=callback)
+    try:
         await scanner.start()
-        print("Scanning started, press Ctrl+C to stop")
+    except BleakError as err:
+        _LOGGER.error('Error: "%s"', err)
+        return
+
+    try:
+        _LOGGER.info("Scanning started, press Ctrl+C to stop")
+        await stop.wait()
+        _LOGGER.info("Stopping scan...")
+    finally:
+        await scanner.stop()
+        _LOGGER.info("Scanning stopped")
 
-        # Keep program running until user interrupts
-        while should_continue:
-            await asyncio.sleep(1)
 
-    except Exception as e:
-        print(f'Error: "{e}"')
+async def survey(profiles, output_dir, queue_size):
+    """Write live advertisements as JSON lines."""
+    pipeline = Pipeline(profiles, output_dir, queue_size)
+    tasks = [
+        asyncio.create_task(pipeline.parse_worker()),
+        asyncio.create_task(pipeline.writer()),
+        asyncio.create_task(pipeline.report()),
+    ]
+    try:
+        await scan(pipeline.detection_callback)
+        # Drain what is left in the queues
+        await asyncio.wait_for(_drain(pipeline), timeout=5)
+    except TimeoutError:
+        pass
     finally:
-        # Ensure scanner stops
-        if scanner:
-            await scanner.stop()
-        print("Scanning stopped")
+        for task in tasks:
+            task.cancel()
+        pipeline.close()
+
+
+async def _drain(pipeline):
+    """Wait until the pipeline queues are empty."""
+    while not (pipeline.frames.empty() and pipeline.records.empty()):
+        await asyncio.sleep(0.1)
+
+
+async def capture(path):
+    """Record live advertisements to a capture file."""
+    with CaptureWriter(path) as writer:
+        await scan(capture_callback(writer))
+    _LOGGER.info("Wrote %s frames to %s", writer.frames, path)
+
+
+async def replay(path, realtime, coordinator):
+    """Replay a capture file through the parser or the coordinator."""
+    frames = list(read_capture(path))
+    if not frames:
+        _LOGGER.info("Capture is empty")
+        return
+
+    hass = None
+    coordinators = {}
+    if coordinator:
+        from homeassistant.components.bluetooth import BluetoothChange
+
+        from harness import async_create_hass, create_coordinator, make_service_info
+
+        hass = await async_create_hass(tempfile.mkdtemp())
+
+    latencies = []
+    start = time.perf_counter()
+    first_timestamp = frames[0].timestamp
+
+    for frame in frames:
+        if realtime:
+            delay = frame.timestamp - first_timestamp - (time.perf_counter() - start)
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+        frame_start = time.perf_counter()
+        if coordinator:
+            mac = frame.address
+            if mac == "00:00:00:00:00:00":
+                # Captured on a platform that reports device UUIDs
+                mac = frame_to_mac(frame.mfr_id, frame.mfr_data)
+            if mac not in coordinators:
+                coordinators[mac] = create_coordinator(
+                    hass, mac, sex, height, age, veryActive
+                )
+            coordinators[mac].async_handle_bluetooth_event(
+                make_service_info(mac, {frame.mfr_id: frame.mfr_data}, frame.rssi),
+                BluetoothChange.ADVERTISEMENT,
+            )
+        else:
+            process_frame(frame.mfr_data, age, sex, height, veryActive)
+        latencies.append(time.perf_counter() - frame_start)
+
+    elapsed = time.perf_counter() - start
+    if hass:
+        await hass.async_block_till_done()
+        await hass.async_stop(force=True)
+
+    quantiles = (
+        statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    )
+    _LOGGER.info(
+        "Replayed %s frames in %.3fs (%.0f frames/s)",
+        len(frames),
+        elapsed,
+        len(frames) / elapsed,
+    )
+    _LOGGER.info(
+        "Latency p50=%.1fus p90=%.1fus p99=%.1fus max=%.1fus",
+        quantiles[49] * 1e6,
+        quantiles[89] * 1e6,
+        quantiles[98] * 1e6,
+        max(latencies) * 1e6,
+    )
+
+
+def main():
+    """Run the mode given on the command line."""
+    parser = argparse.ArgumentParser(description="Yunmai scale debugging tool")
+    parser.add_argument(
+        "--verbose", action="store_true", help="also log every captured frame"
+    )
+    subparsers = parser.add_subparsers(dest="mode")
+    scan_parser = subparsers.add_parser(
+        "scan", help="write live advertisements as JSON lines (default)"
+    )
+    scan_parser.add_argument(
+        "--profiles", type=Path, help="JSON file of per-MAC user profiles"
+    )
+    scan_parser.add_argument(
+        "--output",
+        type=Path,
+        help="directory for per-scale JSONL files (default: stdout)",
+    )
+    scan_parser.add_argument(
+        "--queue-size", type=int, default=1000, help="bounded queue size"
+    )
+    capture_parser = subparsers.add_parser(
+        "capture", help="record advertisements to a file"
+    )
+    capture_parser.add_argument("file", type=Path)
+    replay_parser = subparsers.add_parser(
+        "replay", help="replay a capture file offline"
+    )
+    replay_parser.add_argument("file", type=Path)
+    replay_parser.add_argument(
+        "--realtime",
+        action="store_true",
+        help="keep the captured timing instead of running at max speed",
+    )
+    replay_parser.add_argument(
+        "--coordinator",
+        action="store_true",
+        help="feed frames through the coordinator callback",
+    )
+    args = parser.parse_args()
+
+    # Status goes to stderr, so scan output on stdout stays JSON lines
+    logging.basicConfig(
+        format="%(message)s", level=logging.DEBUG if args.verbose else logging.INFO
+    )
+
+    if args.mode == "capture":
+        asyncio.run(capture(args.file))
+    elif args.mode == "replay":
+        asyncio.run(replay(args.file, args.realtime, args.coordinator))
+    else:
+        output = getattr(args, "output", None)
+        if output is not None:
+            output.mkdir(parents=True, exist_ok=True)
+        asyncio.run(
+            survey(
+                load_profiles(getattr(args, "profiles", None)),
+                output,
+                getattr(args, "queue_size", 1000),
+            )
+        )
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    main()
@@ -0,0 +1,229 @@
+"""Run Yunmai Scale coordinators without a Bluetooth adapter.
+
+Used by the replay, benchmark and simulator tools: a bare Home Assistant
+core is started in a scratch config directory and advertisements are fed
+straight into the coordinators. FakeGattClient stands in for a scale that
+is connected to for a history download.
+"""
+
+from __future__ import annotations
+
+import time
+from types import MappingProxyType
+from typing import Any
+
+from bleak.backends.device import BLEDevice
+from bleak.backends.scanner import AdvertisementData
+from homeassistant.components.bluetooth import BluetoothServiceInfoBleak
+from homeassistant.config_entries import SOURCE_USER, ConfigEntries, ConfigEntry
+from homeassistant.const import CONF_ADDRESS, CONF_NAME
+from homeassistant.core import HomeAssistant
+
+from custom_components.yunmai_scale.const import (
+    CONF_AGE,
+    CONF_GENDER,
+    CONF_HEIGHT,
+    CONF_IS_ACTIVE,
+    DOMAIN,
+    SERVICE_UUID,
+)
+from custom_components.yunmai_scale.coordinator import YunmaiDataCoordinator
+from custom_components.yunmai_scale.gatt_sync import (
+    ACK_STRUCT,
+    CMD_ACK_HISTORY,
+    CMD_HISTORY_END,
+    CMD_READ_HISTORY,
+    END_STRUCT,
+    HISTORY_RECORD_STRUCT,
+    StoredReading,
+    SyncError,
+    decode_message,
+    encode_message,
+)
+from custom_components.yunmai_scale.parse_data import (
+    FAT_FRAME_STRUCT,
+    FRAME_STRUCT,
+    mac_to_frame_prefix,
+)
+
+
+async def async_create_hass(config_dir: str) -> HomeAssistant:
+    """Create a Home Assistant core that config entries can be added to."""
+    hass = HomeAssistant(config_dir)
+    hass.config_entries = ConfigEntries(hass, {})
+    return hass
+
+
+def create_coordinator(
+    hass: HomeAssistant,
+    address: str,
+    gender: int = 1,
+    height: float = 170,
+    age: int = 30,
+    is_active: bool = False,
+    options: dict[str, Any] | None = None,
+) -> YunmaiDataCoordinator:
+    """Create a coordinator for a scale backed by an unsaved config entry."""
+    entry = ConfigEntry(
+        version=1,
+        minor_version=1,
+        domain=DOMAIN,
+        title=f"Yunmai Scale {address}",
+        data={
+            CONF_NAME: f"Yunmai Scale {address}",
+            CONF_ADDRESS: address,
+            CONF_GENDER: gender,
+            CONF_HEIGHT: height,
+            CONF_AGE: age,
+            CONF_IS_ACTIVE: is_active,
+        },
+        options=options or {},
+        source=SOURCE_USER,
+        unique_id=address.replace(":", "").lower(),
+        discovery_keys=MappingProxyType({}),
+    )
+    return YunmaiDataCoordinator(hass, entry)
+
+
+def make_service_info(
+    address: str,
+    manufacturer_data: dict[int, bytes],
+    rssi: int = -60,
+    source: str = "offline",
+) -> BluetoothServiceInfoBleak:
+    """Build the service info Home Assistant passes to Bluetooth callbacks."""
+    advertisement = AdvertisementData(
+        local_name=None,
+        manufacturer_data=manufacturer_data,
+        service_data={},
+        service_uuids=[SERVICE_UUID],
+        tx_power=None,
+        rssi=rssi,
+        platform_data=(),
+    )
+    return BluetoothServiceInfoBleak(
+        name=address,
+        address=address,
+        rssi=rssi,
+        manufacturer_data=manufacturer_data,
+        service_data={},
+        service_uuids=[SERVICE_UUID],
+        source=source,
+        device=BLEDevice(address, None, None, rssi),
+        advertisement=advertisement,
+        connectable=False,
+        time=time.monotonic(),
+        tx_power=None,
+    )
+
+
+def make_frame(
+    address: str,
+    count: int,
+    credibility: int,
+    weight: float,
+    resistance: int = 0,
+    identifier: bytes = b"\x00\x00\x00",
+    body_fat: float | None = None,
+) -> tuple[int, bytes]:
+    """Encode a Yunmai advertisement as (manufacturer id, manufacturer data).
+
+    Frames with a body fat use the layout of firmware that reports it,
+    which the identifier has to select.
+    """
+    mfr_id, prefix = mac_to_frame_prefix(address)
+    fields = (
+        prefix,
+        identifier,
+        count & 0xFF,
+        credibility,
+        round(weight * 100),
+        resistance,
+    )
+    if body_fat is None:
+        return mfr_id, FRAME_STRUCT.pack(*fields)
+    return mfr_id, FAT_FRAME_STRUCT.pack(*fields, round(body_fat * 100))
+
+
+class FakeGattClient:
+    """GATT client of a simulated scale holding stored readings.
+
+    Implements the history download protocol of gatt_sync: stored readings
+    are sent in pages and dropped once acknowledged. With disconnect_after,
+    the connection drops once that many readings have been sent.
+    """
+
+    def __init__(
+        self,
+        readings: list[tuple[float, float, int]],
+        page_size: int = 16,
+        disconnect_after: int | None = None,
+    ) -> None:
+        """Store (timestamp, weight, resistance) readings, numbered from 1."""
+        self.stored = [
+            StoredReading(sequence, timestamp, weight, resistance)
+            for sequence, (timestamp, weight, resistance) in enumerate(readings, 1)
+        ]
+        self.page_size = page_size
+        self.disconnect_after = disconnect_after
+        self.sent = 0
+        self.is_connected = False
+        self.connections = 0
+        self.acknowledged = 0
+        self._callback = None
+
+    async def connect(self) -> None:
+        """Connect to the simulated scale."""
+        self.is_connected = True
+        self.connections += 1
+
+    async def disconnect(self) -> None:
+        """Disconnect from the simulated scale."""
+        self.is_connected = False
+        self._callback = None
+
+    async def start_notify(self, characteristic: str, callback) -> None:
+        """Send notifications to callback."""
+        self._callback = callback
+
+    async def stop_notify(self, characteristic: str) -> None:
+        """Stop sending notifications."""
+        self._callback = None
+
+    async def write(self, characteristic: str, data: bytes) -> None:
+        """Answer a command like the scale does."""
+        if not self.is_connected:
+            raise SyncError("Not connected")
+        command, payload = decode_message(data)
+        if command == CMD_ACK_HISTORY:
+            (sequence,) = ACK_STRUCT.unpack(payload)
+            acknowledged = [
+                reading for reading in self.stored if reading.sequence <= sequence
+            ]
+            self.acknowledged += len(acknowledged)
+            self.stored = self.stored[len(acknowledged) :]
+        elif command == CMD_READ_HISTORY:
+            page = self.stored[: self.page_size]
+            for reading in page:
+                if self.sent == self.disconnect_after:
+                    # The rest of the page and its end are never sent
+                    self.is_connected = False
+                    self._callback = None
+                    return
+                self.sent += 1
+                self._callback(
+                    encode_message(
+                        CMD_READ_HISTORY,
+                        HISTORY_RECORD_STRUCT.pack(
+                            reading.sequence,
+                            int(reading.timestamp),
+                            round(reading.weight * 100),
+                            reading.resistance,
+                        ),
+                    )
+                )
+            self._callback(
+                encode_message(
+                    CMD_HISTORY_END, END_STRUCT.pack(len(self.stored) - len(page))
+                )
+            )
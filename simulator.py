@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""Load-test the coordinators with simulated Yunmai scales.
+
+Every virtual scale repeatedly goes through a weigh-in: measuring frames
+ramping up to its weight, stable frames carrying the resistance, then idle
+frames before it goes quiet, with the count increasing per weigh-in.
+Frames are delivered as Bluetooth service infos through the dispatcher, as
+Home Assistant does, at a fixed rate per scale:
+
+    python simulator.py --scales 100 --rate 10 --duration 30
+    python simulator.py --scales 200 --burst      # everyone weighs in at once
+    python simulator.py --stored 100              # with active history sync
+
+Event loop saturation is reported as the lag of a task sleeping on the
+loop and as the share of time spent in the Bluetooth callbacks.
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import tempfile
+import time
+from collections.abc import Iterator
+
+from homeassistant.components.bluetooth import BluetoothChange
+
+from custom_components.yunmai_scale.const import EVENT_WEIGH_IN
+from custom_components.yunmai_scale.dispatcher import YunmaiDispatcher
+from harness import (
+    FakeGattClient,
+    async_create_hass,
+    create_coordinator,
+    make_frame,
+    make_service_info,
+)
+
+CREDIBILITY_MEASURING = 0x01
+CREDIBILITY_STABLE = 0x03
+CREDIBILITY_IDLE = 0x00
+
+MEASURING_FRAMES = (8, 15)  # range of measuring frames per weigh-in
+STABLE_FRAMES = 5
+IDLE_FRAMES = 3  # idle frames sent after a weigh-in before the scale sleeps
+QUIET_TICKS = (20, 200)  # range of silent ticks between weigh-ins
+BURST_QUIET_TICKS = 50
+LAG_INTERVAL = 0.01
+
+
+class VirtualScale:
+    """Frame source of a single simulated scale."""
+
+    def __init__(self, index: int, rng: random.Random, burst: bool) -> None:
+        """Initialize the scale with a random user."""
+        self.address = f"AA:BB:CC:00:{index >> 8:02X}:{index & 0xFF:02X}"
+        self.rng = rng
+        self.burst = burst
+        self.weight = rng.uniform(50, 100)
+        self.resistance = rng.randint(400, 600)
+        self.count = rng.randint(0, 255)
+
+    def frames(self) -> Iterator[tuple[int, bytes] | None]:
+        """Yield the frame to send at each tick, or None while asleep."""
+        rng = self.rng
+        if not self.burst:
+            # Scales start at different points of their cycle
+            yield from [None] * rng.randint(0, QUIET_TICKS[1])
+
+        while True:
+            self.count = (self.count + 1) & 0xFF
+            self.weight += rng.uniform(-0.5, 0.5)
+
+            measuring = rng.randint(*MEASURING_FRAMES)
+            for step in range(1, measuring + 1):
+                weight = self.weight * step / measuring + rng.uniform(-0.3, 0.3)
+                yield make_frame(
+                    self.address, self.count, CREDIBILITY_MEASURING, max(weight, 0)
+                )
+
+            stable = make_frame(
+                self.address,
+                self.count,
+                CREDIBILITY_STABLE,
+                self.weight,
+                self.resistance + rng.randint(-10, 10),
+            )
+            yield from [stable] * STABLE_FRAMES
+
+            idle = make_frame(self.address, self.count, CREDIBILITY_IDLE, 0)
+            yield from [idle] * IDLE_FRAMES
+
+            quiet = BURST_QUIET_TICKS if self.burst else rng.randint(*QUIET_TICKS)
+            yield from [None] * quiet
+
+
+class Simulation:
+    """Deliver the frames of many virtual scales and measure the event loop."""
+
+    def __init__(
+        self, hass, scales: int, fan_out: bool, seed: int, burst: bool, stored: int
+    ) -> None:
+        """Create the coordinators and virtual scales."""
+        rng = random.Random(seed)
+        self.hass = hass
+        self.scales = [VirtualScale(i, rng, burst) for i in range(scales)]
+        self.coordinators = [
+            create_coordinator(hass, scale.address) for scale in self.scales
+        ]
+        self.dispatcher = YunmaiDispatcher(hass, register_callback=False)
+        for coordinator in self.coordinators:
+            self.dispatcher.async_add_coordinator(coordinator)
+        if stored:
+            # Each scale holds readings from the last days to download
+            now = time.time()
+            for scale, coordinator in zip(self.scales, self.coordinators, strict=True):
+                client = FakeGattClient(
+                    [
+                        (
+                            now - (stored - i) * 3600,
+                            scale.weight + rng.uniform(-1, 1),
+                            scale.resistance,
+                        )
+                        for i in range(stored)
+                    ]
+                )
+                coordinator.active_sync = True
+                coordinator.gatt_client_factory = lambda client=client: client
+        self.fan_out = fan_out
+        self.frames = 0
+        self.late_ticks = 0
+        self.callback_time = 0.0
+        self.lags: list[float] = []
+        self.weigh_ins = 0
+
+    def deliver(self, service_info) -> None:
+        """Hand a service info to the coordinators."""
+        start = time.perf_counter()
+        if self.fan_out:
+            # Every coordinator receives every advertisement
+            for coordinator in self.coordinators:
+                coordinator.async_handle_bluetooth_event(
+                    service_info, BluetoothChange.ADVERTISEMENT
+                )
+        else:
+            self.dispatcher.async_handle_bluetooth_event(
+                service_info, BluetoothChange.ADVERTISEMENT
+            )
+        self.callback_time += time.perf_counter() - start
+        self.frames += 1
+
+    async def run_source(self, rate: float, duration: float) -> None:
+        """Send the next frame of every scale once per tick."""
+        loop = asyncio.get_running_loop()
+        sources = [(scale, scale.frames()) for scale in self.scales]
+        tick = 1 / rate
+        next_tick = start = loop.time()
+        while loop.time() - start < duration:
+            for scale, frames in sources:
+                if (frame := next(frames)) is not None:
+                    mfr_id, mfr_data = frame
+                    self.deliver(make_service_info(scale.address, {mfr_id: mfr_data}))
+            next_tick += tick
+            if (delay := next_tick - loop.time()) > 0:
+                await asyncio.sleep(delay)
+            else:
+                # The loop cannot keep up with the requested rate
+                self.late_ticks += 1
+                await asyncio.sleep(0)
+
+    async def monitor_lag(self) -> None:
+        """Record how late a short sleep on the event loop wakes up."""
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(LAG_INTERVAL)
+            self.lags.append(loop.time() - start - LAG_INTERVAL)
+
+    def report(self, elapsed: float, rate: float) -> None:
+        """Print the delivery rate and event loop saturation."""
+        target = len(self.scales) * rate
+        print(
+            f"Scales:          {len(self.scales)} ({'fan-out' if self.fan_out else 'dispatcher'})"
+        )
+        print(
+            f"Frames:          {self.frames} in {elapsed:.1f}s ({self.frames / elapsed:,.0f}/s)"
+        )
+        print(
+            f"Tick rate:       {rate:g}/s per scale, up to {target:,.0f} frames/s, {self.late_ticks} late ticks"
+        )
+        print(f"Weigh-ins:       {self.weigh_ins}")
+        if synced := sum(coordinator.stats.synced for coordinator in self.coordinators):
+            print(f"Synced readings: {synced}")
+        print(f"Callback load:   {self.callback_time / elapsed:.1%} of the event loop")
+        if self.frames:
+            print(
+                f"Callback mean:   {self.callback_time / self.frames * 1e6:.1f}us per frame"
+            )
+        if len(self.lags) > 1:
+            quantiles = statistics.quantiles(self.lags, n=100)
+            print(
+                f"Loop lag:        p50={quantiles[49] * 1e3:.2f}ms "
+                f"p99={quantiles[98] * 1e3:.2f}ms max={max(self.lags) * 1e3:.2f}ms"
+            )
+
+
+async def simulate(args):
+    """Run the simulation described by the command line arguments."""
+    hass = await async_create_hass(tempfile.mkdtemp())
+    simulation = Simulation(
+        hass, args.scales, args.fan_out, args.seed, args.burst, args.stored
+    )
+
+    def count_weigh_in(_event):
+        simulation.weigh_ins += 1
+
+    hass.bus.async_listen(EVENT_WEIGH_IN, count_weigh_in)
+
+    monitor = asyncio.create_task(simulation.monitor_lag())
+    start = time.perf_counter()
+    await simulation.run_source(args.rate, args.duration)
+    elapsed = time.perf_counter() - start
+    monitor.cancel()
+
+    await hass.async_block_till_done()
+    for coordinator in simulation.coordinators:
+        await hass.async_add_executor_job(coordinator.history.flush)
+    simulation.report(elapsed, args.rate)
+    for coordinator in simulation.coordinators:
+        coordinator.async_stop()
+    await hass.async_stop(force=True)
+
+
+def main():
+    """Parse the command line and run the simulation."""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--scales", type=int, default=100, help="number of virtual scales"
+    )
+    parser.add_argument(
+        "--rate", type=float, default=10, help="advertisements per second per scale"
+    )
+    parser.add_argument("--duration", type=float, default=30, help="seconds to run")
+    parser.add_argument(
+        "--burst", action="store_true", help="start every weigh-in at the same time"
+    )
+    parser.add_argument(
+        "--fan-out",
+        action="store_true",
+        help="call every coordinator instead of routing through the dispatcher",
+    )
+    parser.add_argument(
+        "--stored", type=int, default=0, help="readings stored on each scale to sync"
+    )
+    parser.add_argument(
+        "--seed", type=int, default=0, help="random seed of the virtual users"
+    )
+    args = parser.parse_args()
+
+    asyncio.run(simulate(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Tests for the Yunmai Scale integration."""
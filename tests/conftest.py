@@ -0,0 +1,73 @@
+"""Fixtures for the Yunmai Scale tests."""
+
+from __future__ import annotations
+
+from collections.abc import AsyncGenerator
+from pathlib import Path
+from typing import Any
+
+import pytest
+from homeassistant.const import CONF_ADDRESS, CONF_NAME
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.yunmai_scale.const import (
+    CONF_AGE,
+    CONF_GENDER,
+    CONF_HEIGHT,
+    CONF_IS_ACTIVE,
+    DOMAIN,
+)
+from custom_components.yunmai_scale.coordinator import YunmaiDataCoordinator
+from custom_components.yunmai_scale.history import HISTORY_SUFFIX, MeasurementHistory
+from harness import create_coordinator
+
+pytest_plugins = "pytest_homeassistant_custom_component"
+
+ADDRESS = "AA:BB:CC:DD:EE:FF"
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations):
+    """Load the integration from custom_components."""
+    return
+
+
+@pytest.fixture
+def entry(hass: HomeAssistant) -> MockConfigEntry:
+    """Return the config entry of a scale added to Home Assistant."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="Yunmai Scale",
+        unique_id=ADDRESS.replace(":", "").lower(),
+        data={
+            CONF_NAME: "Yunmai Scale",
+            CONF_ADDRESS: ADDRESS,
+            CONF_GENDER: 1,
+            CONF_HEIGHT: 170,
+            CONF_AGE: 30,
+            CONF_IS_ACTIVE: False,
+        },
+    )
+    entry.add_to_hass(hass)
+    return entry
+
+
+@pytest.fixture
+def coordinator_options() -> dict[str, Any]:
+    """Return the options of the config entry; parametrize to override."""
+    return {}
+
+
+@pytest.fixture
+async def coordinator(
+    hass: HomeAssistant, tmp_path: Path, coordinator_options: dict[str, Any]
+) -> AsyncGenerator[YunmaiDataCoordinator]:
+    """Return a coordinator writing its history to a scratch directory."""
+    coordinator = create_coordinator(hass, ADDRESS, options=coordinator_options)
+    coordinator.history = MeasurementHistory(tmp_path / f"scale{HISTORY_SUFFIX}")
+    yield coordinator
+    coordinator.async_stop()
+    # Also cancels a delayed save of the profile weights
+    await coordinator.async_save_profile_weights()
+    await hass.async_block_till_done()
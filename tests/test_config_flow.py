@@ -0,0 +1,60 @@
+"""Tests for the Yunmai Scale config flow."""
+
+from __future__ import annotations
+
+from unittest.mock import patch
+
+from homeassistant.config_entries import SOURCE_USER
+from homeassistant.const import CONF_ADDRESS, CONF_NAME
+from homeassistant.core import HomeAssistant
+from homeassistant.data_entry_flow import FlowResultType
+
+from custom_components.yunmai_scale.const import CONF_SCALES, DOMAIN
+
+NEW_ADDRESS = "11:22:33:44:55:66"
+PENDING_ADDRESS = "11:22:33:44:55:77"
+
+
+async def test_bulk_reports_failed_rows(hass: HomeAssistant, entry) -> None:
+    """Test the bulk step names the scales whose import did not create an entry."""
+    # A scale being set up in another flow cannot be imported meanwhile
+    pending = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": SOURCE_USER}
+    )
+    pending = await hass.config_entries.flow.async_configure(
+        pending["flow_id"], {"next_step_id": "manual"}
+    )
+    pending = await hass.config_entries.flow.async_configure(
+        pending["flow_id"], {CONF_NAME: "Pending", CONF_ADDRESS: PENDING_ADDRESS}
+    )
+    assert pending["step_id"] == "user_settings"
+
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": SOURCE_USER}
+    )
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], {"next_step_id": "bulk"}
+    )
+    with patch("custom_components.yunmai_scale.async_setup_entry", return_value=True):
+        result = await hass.config_entries.flow.async_configure(
+            result["flow_id"],
+            {
+                CONF_SCALES: (
+                    f"address\n{entry.data[CONF_ADDRESS]}\n"
+                    f"{NEW_ADDRESS}\n{PENDING_ADDRESS}\n"
+                )
+            },
+        )
+        await hass.async_block_till_done()
+
+    assert result["type"] is FlowResultType.ABORT
+    assert result["reason"] == "bulk_import_failed"
+    assert result["description_placeholders"] == {
+        "added": "1",
+        "skipped": "1",
+        "failed": PENDING_ADDRESS,
+    }
+    assert {
+        config_entry.data[CONF_ADDRESS]
+        for config_entry in hass.config_entries.async_entries(DOMAIN)
+    } == {entry.data[CONF_ADDRESS], NEW_ADDRESS}
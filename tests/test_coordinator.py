@@ -0,0 +1,163 @@
+"""Tests for the Yunmai Scale coordinator."""
+
+from __future__ import annotations
+
+import pytest
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import async_capture_events
+
+from custom_components.yunmai_scale import parse_data
+from custom_components.yunmai_scale.const import (
+    CONF_PROFILE_WEIGHTS,
+    CONF_PROFILES,
+    DEFAULT_PROFILE_NAME,
+    EVENT_WEIGH_IN,
+)
+from custom_components.yunmai_scale.coordinator import YunmaiDataCoordinator
+from custom_components.yunmai_scale.parse_data import (
+    CREDIBILITY_IDLE,
+    CREDIBILITY_STABLE,
+    PROTOCOL_ADVERTISEMENT,
+    REPORTED_FAT_VARIANT,
+    ScaleStatus,
+    register_frame_variant,
+)
+from custom_components.yunmai_scale.trends import TrendTracker
+from harness import make_frame
+
+from .conftest import ADDRESS
+
+MEASURING = 0x01
+
+
+def send(
+    coordinator: YunmaiDataCoordinator,
+    count: int,
+    credibility: int,
+    weight: float,
+    resistance: int = 500,
+) -> None:
+    """Feed a frame to the coordinator."""
+    _, mfr_data = make_frame(ADDRESS, count, credibility, weight, resistance)
+    coordinator.async_handle_frame(mfr_data)
+
+
+async def test_first_stable_frame_is_delivered_immediately(
+    hass: HomeAssistant, coordinator: YunmaiDataCoordinator
+) -> None:
+    """Test the first stable frame is published before the weigh-in finishes."""
+    events = async_capture_events(hass, EVENT_WEIGH_IN)
+    send(coordinator, 1, MEASURING, 69.0)
+    send(coordinator, 1, CREDIBILITY_STABLE, 70.0)
+
+    assert coordinator.data.status is ScaleStatus.STABLE
+    assert coordinator.data.weight == 70.0
+    assert coordinator.data.body_fat is not None
+    assert coordinator.weigh_in.active
+    await hass.async_block_till_done()
+    assert not events
+
+
+async def test_repeated_stable_frames_reach_the_median(
+    hass: HomeAssistant, coordinator: YunmaiDataCoordinator
+) -> None:
+    """Test identical stable rebroadcasts are aggregated, not suppressed."""
+    events = async_capture_events(hass, EVENT_WEIGH_IN)
+    for weight in (71.0, 70.0, 70.0, 70.0):
+        send(coordinator, 1, CREDIBILITY_STABLE, weight)
+    assert coordinator.weigh_in.frames == 4
+    assert coordinator.stats.suppressed == 0
+
+    send(coordinator, 1, CREDIBILITY_IDLE, 0.0)
+    await hass.async_block_till_done()
+    assert len(events) == 1
+    assert events[0].data["weight"] == 70.0
+    assert coordinator.data.status is ScaleStatus.IDLE
+    assert len(coordinator.history) == 1
+
+
+async def test_stale_count_does_not_finish_weigh_in(
+    hass: HomeAssistant, coordinator: YunmaiDataCoordinator
+) -> None:
+    """Test a late rebroadcast of a finished weigh-in is ignored."""
+    events = async_capture_events(hass, EVENT_WEIGH_IN)
+    send(coordinator, 1, CREDIBILITY_STABLE, 70.0)
+    send(coordinator, 1, CREDIBILITY_IDLE, 0.0)
+    send(coordinator, 2, CREDIBILITY_STABLE, 80.0)
+
+    send(coordinator, 1, CREDIBILITY_STABLE, 70.0)
+    send(coordinator, 1, CREDIBILITY_IDLE, 0.0)
+    assert coordinator.weigh_in.count == 2
+    assert coordinator.weigh_in.frames == 1
+
+    send(coordinator, 2, CREDIBILITY_IDLE, 0.0)
+    await hass.async_block_till_done()
+    assert [event.data["weight"] for event in events] == [70.0, 80.0]
+
+
+async def test_reported_body_fat_is_recorded(
+    hass: HomeAssistant,
+    coordinator: YunmaiDataCoordinator,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test the sensor, trends and history agree on a reported body fat."""
+    monkeypatch.setattr(parse_data, "_FRAME_VARIANTS", {})
+    register_frame_variant(PROTOCOL_ADVERTISEMENT, (0x1E,), REPORTED_FAT_VARIANT)
+    _, mfr_data = make_frame(
+        ADDRESS,
+        1,
+        CREDIBILITY_STABLE,
+        70.0,
+        500,
+        identifier=bytes((PROTOCOL_ADVERTISEMENT, 0x1E, 0)),
+        body_fat=21.5,
+    )
+    coordinator.async_handle_frame(mfr_data)
+    send(coordinator, 1, CREDIBILITY_IDLE, 0.0)
+    await hass.async_block_till_done()
+
+    assert coordinator.trends.get("body_fat").rolling_mean == 21.5
+    record = coordinator.history[-1]
+    assert record.body_fat == 21.5
+
+    coordinator.trends = TrendTracker()
+    coordinator.async_seed_trends([record])
+    assert coordinator.trends.get("body_fat").rolling_mean == 21.5
+
+
+@pytest.mark.parametrize(
+    "coordinator_options",
+    [
+        {
+            CONF_PROFILES: [
+                {"name": "Kid", "gender": 1, "height": 140, "age": 10, "weight": 30.0}
+            ],
+            CONF_PROFILE_WEIGHTS: {DEFAULT_PROFILE_NAME: 70.0},
+        }
+    ],
+)
+async def test_unmatched_reading_is_unattributed(
+    hass: HomeAssistant, coordinator: YunmaiDataCoordinator
+) -> None:
+    """Test a reading close to no profile is published without one."""
+    events = async_capture_events(hass, EVENT_WEIGH_IN)
+    send(coordinator, 1, CREDIBILITY_STABLE, 50.0)
+    assert coordinator.data.weight == 50.0
+    assert coordinator.data.profile is None
+    assert coordinator.data.body_fat is None
+    send(coordinator, 1, CREDIBILITY_IDLE, 0.0)
+    await hass.async_block_till_done()
+
+    assert events[0].data["weight"] == 50.0
+    assert "profile" not in events[0].data
+    # No profile's weight band moves to the reading
+    assert coordinator.primary_profile.weight == 70.0
+    assert coordinator.profiles["Kid"].weight == 30.0
+    assert coordinator.trends.get("weight") is None
+    assert coordinator.history[-1].profile_id == 0
+
+    send(coordinator, 2, CREDIBILITY_STABLE, 71.0)
+    send(coordinator, 2, CREDIBILITY_IDLE, 0.0)
+    await hass.async_block_till_done()
+    assert events[1].data["profile"] == DEFAULT_PROFILE_NAME
+    assert coordinator.primary_profile.weight == 71.0
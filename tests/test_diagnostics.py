@@ -0,0 +1,45 @@
+"""Tests for the diagnostics of the Yunmai Scale integration."""
+
+from __future__ import annotations
+
+import pytest
+from homeassistant.components.diagnostics import REDACTED
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.yunmai_scale.const import DOMAIN
+from custom_components.yunmai_scale.diagnostics import (
+    async_get_config_entry_diagnostics,
+)
+from custom_components.yunmai_scale.frame_log import MASKED_MAC
+from custom_components.yunmai_scale.parse_data import CREDIBILITY_STABLE
+from harness import make_frame
+
+from .conftest import ADDRESS
+
+
+@pytest.mark.usefixtures("enable_bluetooth")
+async def test_diagnostics_redact_personal_data(
+    hass: HomeAssistant, entry: MockConfigEntry
+) -> None:
+    """Test the address, user info and measurements are redacted."""
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    _, mfr_data = make_frame(ADDRESS, 1, CREDIBILITY_STABLE, 72.5, 520)
+    hass.data[DOMAIN][entry.entry_id].async_handle_frame(mfr_data, -60)
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+
+    assert diagnostics["entry"]["data"]["address"] == REDACTED
+    assert diagnostics["entry"]["data"]["height"] == REDACTED
+    data = diagnostics["data"]
+    assert data["status"] == "stable"
+    assert data["count"] == 1
+    for key in ("weight", "bmi", "body_fat", "visceral_fat", "profile"):
+        assert data[key] == REDACTED
+    (frame,) = diagnostics["raw_frames"]["frames"]
+    assert frame["data"] == MASKED_MAC + mfr_data[4:].hex()
+    assert mfr_data[:4].hex() not in str(diagnostics)
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
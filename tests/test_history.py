@@ -0,0 +1,65 @@
+"""Tests for the measurement history."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+from custom_components.yunmai_scale.history import (
+    HISTORY_SUFFIX,
+    LEGACY_RECORD_STRUCT,
+    LEGACY_SUFFIX,
+    HistoryRecord,
+    MeasurementHistory,
+    profile_id,
+)
+
+
+def test_append_and_read(tmp_path: Path) -> None:
+    """Test records are read back with their reported body fat."""
+    history = MeasurementHistory(tmp_path / f"scale{HISTORY_SUFFIX}")
+    history.append(1000.0, 70.25, 500, 1, "Alice")
+    history.append(2000.0, 71.5, 510, 2, "Alice", body_fat=21.37)
+    assert len(history) == 0
+    history.flush()
+
+    assert len(history) == 2
+    assert history[0] == HistoryRecord(1000.0, 70.25, 500, 1, profile_id("Alice"))
+    assert history[-1].body_fat == 21.37
+    assert [record.timestamp for record in history.iter_range(1500.0)] == [2000.0]
+
+
+def test_merge_in_time_order(tmp_path: Path) -> None:
+    """Test merged records are inserted before newer stored ones."""
+    history = MeasurementHistory(tmp_path / f"scale{HISTORY_SUFFIX}")
+    history.append(1000.0, 70.0, 500, 1, body_fat=20.0)
+    history.append(3000.0, 72.0, 520, 3)
+    history.merge(
+        [
+            HistoryRecord(2000.0, 71.0, 510, 2, 0),
+            HistoryRecord(500.0, 69.0, 490, 0, 0),
+        ]
+    )
+
+    records = history.tail(10)
+    assert [record.timestamp for record in records] == [500.0, 1000.0, 2000.0, 3000.0]
+    assert [record.body_fat for record in records] == [None, 20.0, None, None]
+
+
+def test_migrate_legacy_file(tmp_path: Path) -> None:
+    """Test a file of the legacy layout is converted once."""
+    legacy_path = tmp_path / f"scale{LEGACY_SUFFIX}"
+    legacy_path.write_bytes(
+        LEGACY_RECORD_STRUCT.pack(1000.0, 7000, 500, 1, profile_id("Alice"))
+        + LEGACY_RECORD_STRUCT.pack(2000.0, 7100, 510, 2, 0)
+    )
+    history = MeasurementHistory(tmp_path / f"scale{HISTORY_SUFFIX}")
+    history.migrate()
+
+    assert not legacy_path.exists()
+    assert history.tail(10) == [
+        HistoryRecord(1000.0, 70.0, 500, 1, profile_id("Alice")),
+        HistoryRecord(2000.0, 71.0, 510, 2, 0),
+    ]
+    # Already migrated
+    history.migrate()
+    assert len(history) == 2
@@ -0,0 +1,92 @@
+"""Tests for setting up the Yunmai Scale integration."""
+
+from __future__ import annotations
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import CONF_ADDRESS
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.yunmai_scale import CONFIG_SCHEMA
+from custom_components.yunmai_scale.const import (
+    CONF_AGE,
+    CONF_GENDER,
+    CONF_HEIGHT,
+    CONF_IS_ACTIVE,
+    CONF_SCALES,
+    DOMAIN,
+    SERVICE_IMPORT_STATISTICS,
+)
+
+from .conftest import ADDRESS
+
+# Loading the integration, e.g. to match a discovered scale, must not import
+# what only a configured scale needs
+DEFERRED_MODULES = (
+    "coordinator",
+    "dispatcher",
+    "provisioning",
+    "services",
+    "yunmai_kernel",
+)
+
+LOAD_SCRIPT = """
+import sys
+import custom_components.yunmai_scale
+print(" ".join(sorted(sys.modules)))
+"""
+
+
+def test_loading_defers_runtime_modules() -> None:
+    """Test the integration package imports none of the deferred modules."""
+    result = subprocess.run(
+        [sys.executable, "-c", LOAD_SCRIPT],
+        capture_output=True,
+        check=True,
+        cwd=Path(__file__).parent.parent,
+        text=True,
+    )
+    loaded = set(result.stdout.split())
+    assert (
+        not {f"custom_components.yunmai_scale.{name}" for name in DEFERRED_MODULES}
+        & loaded
+    )
+
+
+def test_config_schema() -> None:
+    """Test scales configured in YAML are validated with their defaults."""
+    assert CONFIG_SCHEMA({"sensor": []}) == {"sensor": []}
+
+    config = CONFIG_SCHEMA({DOMAIN: {CONF_SCALES: [{CONF_ADDRESS: ADDRESS.lower()}]}})
+    assert config[DOMAIN][CONF_SCALES] == [
+        {
+            CONF_ADDRESS: ADDRESS,
+            CONF_GENDER: 1,
+            CONF_HEIGHT: 170,
+            CONF_AGE: 30,
+            CONF_IS_ACTIVE: False,
+        }
+    ]
+
+
+@pytest.mark.usefixtures("enable_bluetooth")
+async def test_setup_entry(hass: HomeAssistant, entry: MockConfigEntry) -> None:
+    """Test a scale is set up and registers the services of the integration."""
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    assert entry.state is ConfigEntryState.LOADED
+    assert hass.services.has_service(DOMAIN, SERVICE_IMPORT_STATISTICS)
+
+    # Changed user info is applied to the running coordinator
+    hass.config_entries.async_update_entry(entry, data={**entry.data, CONF_HEIGHT: 180})
+    await hass.async_block_till_done()
+    assert hass.data[DOMAIN][entry.entry_id].primary_profile.height == 180
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+    assert entry.state is ConfigEntryState.NOT_LOADED
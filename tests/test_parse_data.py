@@ -0,0 +1,70 @@
+"""Tests for decoding Yunmai advertisements."""
+
+from __future__ import annotations
+
+import pytest
+
+from custom_components.yunmai_scale import parse_data
+from custom_components.yunmai_scale.parse_data import (
+    CREDIBILITY_STABLE,
+    FAT_FRAME_STRUCT,
+    FRAME_STRUCT,
+    LEGACY_VARIANT,
+    PROTOCOL_ADVERTISEMENT,
+    REPORTED_FAT_VARIANT,
+    decode_frame,
+    frame_variant,
+    register_frame_variant,
+)
+
+PREFIX = b"\xdd\xcc\xbb\xaa"
+VERSION = 0x1E
+
+
+def fat_frame(fat: int, version: int = VERSION) -> bytes:
+    """Return a stable frame with a trailing body fat in 0.01 %."""
+    identifier = bytes((PROTOCOL_ADVERTISEMENT, version, 0))
+    return FAT_FRAME_STRUCT.pack(
+        PREFIX, identifier, 7, CREDIBILITY_STABLE, 7025, 500, fat
+    )
+
+
+@pytest.fixture
+def reported_fat_version(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Register the reported fat layout for VERSION until the test ends."""
+    monkeypatch.setattr(parse_data, "_FRAME_VARIANTS", {})
+    register_frame_variant(PROTOCOL_ADVERTISEMENT, (VERSION,), REPORTED_FAT_VARIANT)
+
+
+def test_decode_legacy_frame() -> None:
+    """Test a legacy frame."""
+    data = FRAME_STRUCT.pack(PREFIX, b"\x00\x00\x00", 7, CREDIBILITY_STABLE, 7025, 500)
+    assert frame_variant(data) is LEGACY_VARIANT
+
+    frame = decode_frame(data)
+    assert frame.count == 7
+    assert frame.credibility == CREDIBILITY_STABLE
+    assert frame.weight == pytest.approx(70.25)
+    assert frame.resistance == 500
+    assert frame.body_fat is None
+    assert decode_frame(data[:-1]) is None
+
+
+def test_unconfirmed_versions_ignore_trailing_bytes() -> None:
+    """Test trailing bytes are not taken for body fat without a confirmed layout."""
+    frame = decode_frame(fat_frame(2137))
+    assert frame.weight == pytest.approx(70.25)
+    assert frame.body_fat is None
+
+
+@pytest.mark.usefixtures("reported_fat_version")
+def test_decode_reported_fat() -> None:
+    """Test the body fat of a registered version is decoded."""
+    assert frame_variant(fat_frame(2137)) is REPORTED_FAT_VARIANT
+    assert decode_frame(fat_frame(2137)).body_fat == pytest.approx(21.37)
+    # Out of range values are computed from the resistance instead
+    assert decode_frame(fat_frame(9000)).body_fat is None
+    # Short frames of the version, such as idle ones, carry no body fat
+    assert decode_frame(fat_frame(2137)[: FRAME_STRUCT.size]).body_fat is None
+    # Other versions keep the legacy layout
+    assert decode_frame(fat_frame(2137, VERSION + 1)).body_fat is None
@@ -0,0 +1,40 @@
+"""Tests for the user profiles sharing a scale."""
+
+from __future__ import annotations
+
+from custom_components.yunmai_scale.profiles import ProfileIndex, UserProfile
+
+
+def test_match_closest_profile() -> None:
+    """Test a reading is matched to the closest weight within the tolerance."""
+    index = ProfileIndex(3.0)
+    alice = UserProfile("Alice", 0, 165, weight=60.0)
+    bob = UserProfile("Bob", 1, 180, weight=80.0)
+    carol = UserProfile("Carol", 0, 170, weight=62.0)
+    for profile in (bob, UserProfile("Guest"), alice, carol):
+        index.add(profile)
+
+    # Profiles without a weight cannot be matched
+    assert len(index) == 3
+    assert index.match(60.5) is alice
+    assert index.match(61.5) is carol
+    assert index.match(82.9) is bob
+    assert index.match(70.0) is None
+
+
+def test_update_moves_profile() -> None:
+    """Test a profile is matched at its new weight only."""
+    index = ProfileIndex(2.0)
+    alice = UserProfile("Alice", weight=60.0)
+    twin = UserProfile("Twin", weight=60.0)
+    index.add(alice)
+    index.add(twin)
+
+    index.update(twin, 70.0)
+    assert twin.weight == 70.0
+    assert index.match(60.0) is alice
+    assert index.match(69.0) is twin
+
+    index.remove(alice)
+    assert len(index) == 1
+    assert index.match(60.0) is None
@@ -0,0 +1,81 @@
+"""Tests for the services of the Yunmai Scale integration."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime
+
+import pytest
+from homeassistant.components.recorder.models import StatisticMeanType
+from homeassistant.const import PERCENTAGE, UnitOfMass
+
+from custom_components.yunmai_scale.const import (
+    ATTR_RESISTANCE,
+    ATTR_TIMESTAMP,
+    ATTR_WEIGHT,
+)
+from custom_components.yunmai_scale.profiles import UserProfile
+from custom_components.yunmai_scale.services import (
+    hourly_metrics,
+    statistic_metadata,
+)
+
+
+def test_hourly_metrics() -> None:
+    """Test readings are aggregated per hour with the metrics of the sensors."""
+    profile = UserProfile("Default", 1, 175, 30, False)
+    readings = [
+        (datetime(2024, 1, 1, 7, 5, tzinfo=UTC), 72.0, 520),
+        (datetime(2024, 1, 1, 7, 55, tzinfo=UTC), 73.0, 510),
+        (datetime(2024, 1, 1, 8, 0, tzinfo=UTC), 72.5, 500),
+    ]
+    hourly = hourly_metrics(
+        [
+            {
+                ATTR_TIMESTAMP: timestamp,
+                ATTR_WEIGHT: weight,
+                ATTR_RESISTANCE: resistance,
+            }
+            for timestamp, weight, resistance in readings
+        ],
+        profile,
+    )
+
+    seven, eight = (
+        datetime(2024, 1, 1, 7, tzinfo=UTC),
+        datetime(2024, 1, 1, 8, tzinfo=UTC),
+    )
+    assert hourly["weight"] == {seven: (72.5, 72.0, 73.0), eight: (72.5, 72.5, 72.5)}
+    first, second, third = (
+        profile.kernel(weight, resistance, profile.age)
+        for _, weight, resistance in readings
+    )
+    for metric, value in third.items():
+        assert hourly[metric][eight] == pytest.approx((value, value, value))
+    for metric in first:
+        mean, low, high = hourly[metric][seven]
+        assert mean == pytest.approx((first[metric] + second[metric]) / 2)
+        assert (low, high) == pytest.approx(
+            (min(first[metric], second[metric]), max(first[metric], second[metric]))
+        )
+
+
+def test_hourly_metrics_without_readings() -> None:
+    """Test no statistics are computed without readings."""
+    assert hourly_metrics([], UserProfile("Default")) == {}
+
+
+def test_statistic_metadata() -> None:
+    """Test imported statistics have a mean and the class of their unit."""
+    metadata = statistic_metadata(
+        "Yunmai Scale Default Weight", "yunmai_scale:scale_default_weight", "kg"
+    )
+    assert metadata["mean_type"] is StatisticMeanType.ARITHMETIC
+    assert metadata["unit_class"] == "mass"
+    assert metadata["unit_of_measurement"] == UnitOfMass.KILOGRAMS
+    assert not metadata["has_sum"]
+
+    metadata = statistic_metadata(
+        "Yunmai Scale Default Body Fat", "yunmai_scale:scale_default_body_fat", "%"
+    )
+    assert metadata["unit_class"] is None
+    assert metadata["unit_of_measurement"] == PERCENTAGE
@@ -0,0 +1,70 @@
+"""Tests for the weigh-in session tracker."""
+
+from __future__ import annotations
+
+from custom_components.yunmai_scale.parse_data import CREDIBILITY_STABLE, YunmaiFrame
+from custom_components.yunmai_scale.session import FINISHED_COUNTS, WeighInTracker
+
+
+def stable_frame(count: int, weight: float, resistance: int = 500) -> YunmaiFrame:
+    """Return a decoded stable frame."""
+    return YunmaiFrame(b"", b"", count, CREDIBILITY_STABLE, weight, resistance)
+
+
+def test_median_includes_repeated_frames() -> None:
+    """Test identical stable frames all count towards the median."""
+    tracker = WeighInTracker()
+    for weight in (70.0, 70.0, 70.0, 71.0):
+        assert tracker.add_stable(stable_frame(1, weight), 0.0) is None
+    assert tracker.frames == 4
+
+    reading = tracker.finish()
+    assert reading.count == 1
+    assert reading.weight == 70.0
+    assert reading.frames == 4
+    assert not tracker.active
+
+
+def test_new_count_finishes_previous_weigh_in() -> None:
+    """Test a stable frame with a new count finishes the current weigh-in."""
+    tracker = WeighInTracker()
+    tracker.add_stable(stable_frame(1, 70.0), 0.0)
+
+    reading = tracker.add_stable(stable_frame(2, 80.0), 1.0)
+    assert reading.count == 1
+    assert reading.weight == 70.0
+    assert tracker.count == 2
+    assert tracker.frames == 1
+
+
+def test_stale_count_is_ignored() -> None:
+    """Test a late rebroadcast neither finishes nor starts a weigh-in."""
+    tracker = WeighInTracker()
+    tracker.add_stable(stable_frame(1, 70.0), 0.0)
+    assert tracker.finish() is not None
+    tracker.add_stable(stable_frame(2, 80.0), 1.0)
+
+    assert tracker.is_stale(1)
+    assert tracker.add_stable(stable_frame(1, 70.0), 2.0) is None
+    assert tracker.count == 2
+    assert tracker.frames == 1
+
+    reading = tracker.finish()
+    assert reading.count == 2
+    assert reading.weight == 80.0
+    # With no weigh-in in progress, rebroadcasts are still not restarted
+    assert tracker.add_stable(stable_frame(2, 80.0), 3.0) is None
+    assert not tracker.active
+
+
+def test_finished_counts_are_bounded() -> None:
+    """Test only the most recent finished counts are remembered."""
+    tracker = WeighInTracker()
+    for count in range(FINISHED_COUNTS + 1):
+        tracker.add_stable(stable_frame(count, 70.0), float(count))
+        tracker.finish()
+
+    assert not tracker.is_stale(0)
+    assert tracker.is_stale(FINISHED_COUNTS)
+    assert tracker.add_stable(stable_frame(0, 70.0), 10.0) is None
+    assert tracker.active
@@ -0,0 +1,105 @@
+"""Tests for downloading the readings stored on a scale."""
+
+from __future__ import annotations
+
+import pytest
+
+from custom_components.yunmai_scale import gatt_sync
+from custom_components.yunmai_scale.const import SYNC_MATCH_WINDOW
+from custom_components.yunmai_scale.coordinator import YunmaiDataCoordinator
+from harness import FakeGattClient
+
+START = 1_700_000_000.0
+
+
+def stored_readings(count: int) -> list[tuple[float, float, int]]:
+    """Return (timestamp, weight, resistance) readings an hour apart."""
+    return [
+        (START + index * 3600, 70 + index * 0.1, 500 + index) for index in range(count)
+    ]
+
+
+@pytest.fixture(autouse=True)
+def short_response_timeout(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Fail a dropped transfer without waiting for the real timeout."""
+    monkeypatch.setattr(gatt_sync, "RESPONSE_TIMEOUT", 0.01)
+
+
+async def test_sync(coordinator: YunmaiDataCoordinator) -> None:
+    """Test every page is persisted and acknowledged."""
+    client = FakeGattClient(stored_readings(40), page_size=16)
+    coordinator.gatt_client_factory = lambda: client
+
+    assert await coordinator.async_sync_history() == 40
+    assert client.acknowledged == 40
+    assert not client.stored
+    assert not client.is_connected
+    assert coordinator.stats.synced == 40
+
+    records = coordinator.history.tail(100)
+    assert [(record.timestamp, record.resistance) for record in records] == [
+        (timestamp, resistance) for timestamp, _, resistance in stored_readings(40)
+    ]
+    assert records[0].weight == pytest.approx(70.0)
+
+
+async def test_disconnect_mid_transfer(coordinator: YunmaiDataCoordinator) -> None:
+    """Test only persisted pages are acknowledged when the connection drops."""
+    client = FakeGattClient(stored_readings(40), page_size=16, disconnect_after=20)
+    coordinator.gatt_client_factory = lambda: client
+
+    assert await coordinator.async_sync_history() == 0
+    assert coordinator.stats.sync_failures == 1
+    # The first page was persisted before it was acknowledged
+    assert client.acknowledged == 16
+    assert len(client.stored) == 24
+    assert len(coordinator.history) == 16
+
+    client.disconnect_after = None
+    assert await coordinator.async_sync_history() == 24
+    assert client.connections == 2
+    assert len(coordinator.history) == 40
+
+
+async def test_failed_persist_is_not_acknowledged(
+    coordinator: YunmaiDataCoordinator, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test readings stay on the scale when they cannot be stored."""
+    client = FakeGattClient(stored_readings(4))
+    coordinator.gatt_client_factory = lambda: client
+
+    def merge(records):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(coordinator.history, "merge", merge)
+    assert await coordinator.async_sync_history() == 0
+    assert coordinator.stats.sync_failures == 1
+    assert client.acknowledged == 0
+    assert len(client.stored) == 4
+
+
+async def test_resync_skips_recorded_readings(
+    coordinator: YunmaiDataCoordinator,
+) -> None:
+    """Test readings already recorded from advertisements are not duplicated."""
+    readings = stored_readings(6)
+    history = coordinator.history
+    # Weigh-ins seen live are recorded a little later than the scale's clock
+    for timestamp, weight, resistance in readings[::2]:
+        history.append(timestamp + SYNC_MATCH_WINDOW / 2, weight, resistance, 0)
+    # Same weight but a different resistance is another weigh-in
+    timestamp, weight, resistance = readings[1]
+    history.append(timestamp, weight, resistance + 1, 0)
+    history.flush()
+
+    client = FakeGattClient(readings)
+    coordinator.gatt_client_factory = lambda: client
+    assert await coordinator.async_sync_history() == 6
+    assert client.acknowledged == 6
+    assert len(history) == 7
+
+    # Readings downloaded again, e.g. after a lost acknowledgement, are skipped
+    client = FakeGattClient(readings)
+    coordinator.gatt_client_factory = lambda: client
+    assert await coordinator.async_sync_history() == 6
+    assert len(history) == 7
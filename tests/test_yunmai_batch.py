@@ -0,0 +1,58 @@
+"""Tests for the vectorized body composition calculations."""
+
+from __future__ import annotations
+
+import random
+
+import numpy as np
+
+from custom_components.yunmai_scale.yunmai_batch import compute_metrics
+from custom_components.yunmai_scale.yunmai_lib import YmLib
+
+
+def test_matches_ymlib() -> None:
+    """Test every metric matches YmLib bit for bit."""
+    rng = random.Random(0)
+    readings = [
+        (
+            round(rng.uniform(20, 200), 2),
+            rng.randrange(0, 3000),
+            rng.randrange(5, 100),
+            rng.randrange(2),
+            rng.randrange(100, 221),
+            rng.random() < 0.5,
+        )
+        for _ in range(2000)
+    ]
+    metrics = compute_metrics(
+        *(np.array(column) for column in zip(*readings, strict=True))
+    )
+
+    for index, (weight, resistance, age, sex, height, active) in enumerate(readings):
+        scale = YmLib(sex, height, active)
+        fat = scale.get_fat(age, weight, resistance)
+        muscle = scale.get_muscle(fat)
+        expected = {
+            "weight": weight,
+            "bmi": scale.get_bmi(weight),
+            "body_fat": fat,
+            "muscle_mass": muscle,
+            "water_percentage": scale.get_water(fat),
+            "bone_mass": scale.get_bone_mass(muscle, weight),
+            "skeletal_muscle": scale.get_skeletal_muscle(fat),
+            "lean_body_mass": scale.get_lean_body_mass(weight, fat),
+            "visceral_fat": scale.get_visceral_fat(fat, age),
+        }
+        assert {
+            metric: float(values[index]) for metric, values in metrics.items()
+        } == expected, readings[index]
+
+
+def test_broadcasts_profile() -> None:
+    """Test scalar profile values apply to every measurement."""
+    metrics = compute_metrics([60.0, 72.5], [480, 520], 30, 1, 175, False)
+    scale = YmLib(1, 175, False)
+    assert metrics["body_fat"].tolist() == [
+        scale.get_fat(30, 60.0, 480),
+        scale.get_fat(30, 72.5, 520),
+    ]